@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Adaptive Aufnahmequalität nach Umgebungslicht und Bewegungsaktivität.
+
+Vor jeder Aufnahme wird ein Profil (CRF, max. Bitrate) gewählt:
+- ring oder viel Bewegung      -> "high"  (volle Qualität)
+- etwas Bewegung               -> "medium"
+- dunkel und ruhig             -> "low"   (wenig Details zu verlieren)
+Die Aktivität setzt sich aus den PIR-Flanken der letzten Minute und dem
+letzten motion_score (motion_verify) zusammen. Die Flanken werden relativ zur
+Auslöse-Schwelle der Trigger-Regel bewertet - bei jeder Aufnahme sind ja
+schon mindestens so viele Flanken gezählt. Der Score verfällt mit der Zeit,
+damit ein einzelner bewegter Clip nicht alle folgenden auf "high" hält.
+
+Auflösung und Bildrate sind in allen Profilen gleich (die der Kamera), damit
+der Tages-Digest die Clips weiterhin per Stream-Copy aneinanderhängen kann -
+Clips mit anderer Bildrate haben eine andere Zeitbasis. Gespart wird nur über
+die Ratenkontrolle.
+Ein Profilwechsel mitten im Clip wird nicht unterstützt - der Encoder läuft
+mit festen Parametern.
+
+Aufruf als Skript vergleicht fest vs. adaptiv auf synthetischen Eingaben:
+    python3 adaptive_capture.py --benchmark
+"""
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+PROFILES = {
+    "high":   {"crf": 23, "maxrate": "1500k"},
+    "medium": {"crf": 26, "maxrate": "800k"},
+    "low":    {"crf": 30, "maxrate": "300k"},
+}
+
+DARK_LIGHT_LEVEL = 15       # Helligkeit in % unter der es als "dunkel" gilt
+ACTIVITY_WINDOW = 60        # Sekunden, über die PIR-Flanken gezählt werden
+BUSY_EDGE_FACTOR = 3        # Ab dem 3-fachen der Auslöse-Schwelle -> "high"
+QUIET_EDGE_FACTOR = 2       # Bis zum 2-fachen der Schwelle kann die Szene ruhig sein
+BUSY_SCORE = 0.01           # Ab diesem motion_score -> "high"
+QUIET_SCORE = 0.002         # Unter diesem motion_score gilt die Szene als ruhig
+SCORE_HALF_LIFE = 60        # Sekunden, nach denen der letzte Score nur noch halb zählt
+SCORE_MAX_AGE = 300         # Danach ist der letzte Score vergessen
+
+
+class ActivityTracker:
+    """Merkt sich PIR-Flanken und den letzten motion_score (thread-sicher)"""
+
+    def __init__(self, window=ACTIVITY_WINDOW):
+        self.window = window
+        self._edges = deque()
+        self._last_score = None
+        self._score_time = None
+        self._lock = threading.Lock()
+
+    def add_edge(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._edges.append(now)
+            self._trim(now)
+
+    def add_score(self, score, now=None):
+        if score is not None:
+            now = time.time() if now is None else now
+            with self._lock:
+                self._last_score = score
+                self._score_time = now
+
+    def _trim(self, now):
+        while self._edges and now - self._edges[0] > self.window:
+            self._edges.popleft()
+
+    def snapshot(self, now=None):
+        """(Flanken im Fenster, verfallener letzter Score oder None)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._trim(now)
+            score = None
+            if self._last_score is not None:
+                age = max(0.0, now - self._score_time)
+                if age <= SCORE_MAX_AGE:
+                    score = self._last_score * 0.5 ** (age / SCORE_HALF_LIFE)
+            return len(self._edges), score
+
+
+def choose_profile(event_type, light_level=None, edges=0, last_score=None, trigger_edges=1):
+    """Wählt den Profilnamen für eine Aufnahme.
+
+    trigger_edges ist die Anzahl Flanken, ab der die Trigger-Regel auslöst.
+    """
+    if event_type == "ring":
+        return "high"  # Klingeln ist immer wichtig
+    trigger_edges = max(1, trigger_edges)
+    if last_score is not None:
+        # Der verifizierte Score sagt, ob im Bild wirklich etwas passiert -
+        # viele PIR-Flanken bei ruhigem Bild sind meist Wärme, keine Bewegung
+        if last_score >= BUSY_SCORE:
+            return "high"
+        quiet = last_score < QUIET_SCORE
+    else:
+        # Noch kein (frischer) Score: nur Flanken deutlich über der Auslöse-Schwelle zählen
+        if edges >= trigger_edges * BUSY_EDGE_FACTOR:
+            return "high"
+        quiet = edges <= trigger_edges * QUIET_EDGE_FACTOR
+    dark = light_level is not None and light_level < DARK_LIGHT_LEVEL
+    if dark and quiet:
+        return "low"
+    return "medium"
+
+
+def encode_args(profile_name, output_path):
+    """ffmpeg-Ausgabeargumente für ein Profil (nur Ratenkontrolle - Auflösung und fps bleiben)"""
+    profile = PROFILES[profile_name]
+    return [
+        '-vf', 'format=yuv420p',
+        '-c:v', 'libx264',
+        '-preset', 'ultrafast',
+        '-crf', str(profile["crf"]),
+        '-maxrate', profile["maxrate"],
+        '-bufsize', profile["maxrate"],
+        '-y',
+        str(output_path)
+    ]
+
+
+# ----- Benchmark -----
+
+SCENES = {
+    # Viel Bewegung bei Tag
+    "busy_day": "testsrc2=size=640x480:rate=30",
+    # Dunkle, ruhige Szene mit Sensorrauschen
+    "dark_static": "color=c=0x101010:size=640x480:rate=30,noise=alls=6:allf=t",
+}
+# Werte, wie sie der Trigger-Pfad liefert: die Standard-Regel löst erst nach
+# 3 Flanken aus, also ist edges bei einer Motion-Aufnahme immer >= 3
+SCENE_INPUTS = {
+    "busy_day": {"event_type": "motion", "light_level": 70, "edges": 9, "last_score": 0.03,
+                 "trigger_edges": 3},
+    "dark_static": {"event_type": "motion", "light_level": 5, "edges": 3, "last_score": 0.0005,
+                    "trigger_edges": 3},
+}
+
+
+def _encode(source, args, duration):
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    subprocess.run(['ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', source, '-t', str(duration)] + args,
+                   check=True, capture_output=True)
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return cpu, time.perf_counter() - start
+
+
+def fixed_encode_args(output_path):
+    """Bisherige feste Einstellungen (30 fps, Standard-CRF) als Referenz"""
+    return ['-vf', 'format=yuv420p', '-c:v', 'libx264', '-preset', 'ultrafast', '-y', str(output_path)]
+
+
+def benchmark(duration=10):
+    """Vergleicht feste und adaptive Einstellungen: CPU-Zeit und Bytes pro Clip"""
+    totals = {"fixed": [0.0, 0], "adaptive": [0.0, 0]}
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'Szene':<12} {'Modus':<9} {'Profil':<7} {'CPU s':>7} {'KB':>8}")
+        for scene, source in SCENES.items():
+            adaptive_profile = choose_profile(**SCENE_INPUTS[scene])
+            for mode, profile in (("fixed", "-"), ("adaptive", adaptive_profile)):
+                out = Path(tmp) / f"{scene}_{mode}.mp4"
+                args = fixed_encode_args(out) if mode == "fixed" else encode_args(profile, out)
+                cpu, _ = _encode(source, args, duration)
+                size = out.stat().st_size
+                totals[mode][0] += cpu
+                totals[mode][1] += size
+                print(f"{scene:<12} {mode:<9} {profile:<7} {cpu:>7.2f} {size / 1024:>8.0f}")
+
+    fixed_cpu, fixed_bytes = totals["fixed"]
+    adaptive_cpu, adaptive_bytes = totals["adaptive"]
+    print(f"\nAdaptiv: {100 * (1 - adaptive_cpu / fixed_cpu):.0f}% weniger CPU, "
+          f"{100 * (1 - adaptive_bytes / fixed_bytes):.0f}% weniger Bytes")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Adaptive Aufnahmequalität")
+    parser.add_argument("--benchmark", action="store_true", help="Fest vs. adaptiv vergleichen")
+    parser.add_argument("--duration", type=int, default=10)
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(args.duration)
+    else:
+        parser.print_help()
@@ -1,8 +1,8 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, send_file, send_from_directory
 from werkzeug.utils import secure_filename
 import sqlite3
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, date, timedelta
 
 # Deutsche Zeitzone (MEZ/MESZ manuell: UTC+1 Winter, UTC+2 Sommer)
 import zoneinfo
@@ -10,12 +10,27 @@ LOCAL_TZ = zoneinfo.ZoneInfo("Europe/Berlin")
 import threading
 import time
 import subprocess
+import tempfile
 import os
-import math
 import RPi.GPIO as GPIO
 from pitop.pma import Button, LightSensor, LED
+from response_cache import ResponseCache, SqliteDataVersion
+import assets
+import motion_verify
+from camera_broker import CameraBroker
+import export
+import digest
+from notifications import Notifier, WebhookSink, MqttSink, ScriptSink
+from federation import Federation, make_thumbnail
+from db_maintenance import DbMaintenance, find_archived_event, count_events
+from trigger_rules import RuleEngine
+from sensor_conversion import SensorConverter
+from supervisor import Supervisor
+import reconcile
+import adaptive_capture
 
 app = Flask(__name__)
+assets.init_app(app)  # Gehashte, vorkomprimierte Assets + gzip für JSON
 
 # Pin-Definitionen für Pi-Top (BCM-Nummern!)
 BUTTON_PIN = 26        # D2 = GPIO26 (BCM)
@@ -27,34 +42,132 @@ VIDEO_DURATION_BUTTON = 10  # 10 Sekunden Aufnahme bei Button
 VIDEO_DURATION_MOTION = 5   # 5 Sekunden Aufnahme bei Motion
 VIDEO_FPS = 30
 VIDEO_RESOLUTION = "640x480"
+VIDEO_DEVICE = "/dev/video0"
+CAMERA_INPUT_FORMAT = "mjpeg"  # Kamera liefert MJPEG direkt; "" = Rohformat, Broker kodiert einmal selbst
+LIVE_FPS = 10                  # Bildrate der Live-Ansicht (unabhängig von der Aufnahme)
+ADAPTIVE_CAPTURE = True        # Qualität/Bitrate pro Clip nach Licht und Aktivität wählen
+LIGHT_SENSOR_PORT = None       # z.B. "A1" - Lichtsensor für adaptive Qualität (A0 = Temperatur)
 
-# Motion-Einstellungen
+# Motion-Einstellungen (Standard-Regel, falls trigger_rules.json fehlt)
 MOTION_THRESHOLD = 3     # 3 Bewegungen
 MOTION_TIMEFRAME = 30    # in 30 Sekunden
 MOTION_COOLDOWN = 5      # 5 Sekunden Pause nach jeder Erkennung
+MOTION_TRIGGER_COOLDOWN = 8  # Extra langer Cooldown nach ausgelöster Aufnahme
 
-# Temperatur-Einstellungen (Grove Temperature Sensor v1.2)
-TEMP_B = 4275       # B-Wert des NTC Thermistors
-TEMP_R0 = 100000    # Widerstand bei 25°C (100K Ohm)
+# Trigger-Regeln (werden bei Änderung automatisch neu geladen)
+TRIGGER_RULES_PATH = None    # None = trigger_rules.json neben app.py
+TRIGGER_TRACE_PATH = None    # z.B. "trigger_trace.csv" - zeichnet Eingänge für replay auf
+
+# Motion-Verifikation (Frame-Differenz auf dem fertigen Clip)
+MOTION_VERIFY_ENABLED = True
+MOTION_VERIFY_MIN_SCORE = 0.002   # Anteil bewegter Pixel (90. Perzentil) für "echte" Bewegung
+MOTION_VERIFY_MODE = "keep"       # "keep" = nur Score speichern, "drop_video" = Event ohne Clip, "discard" = verwerfen
+
+# Digest-Einstellungen (Tageszusammenfassung)
+DIGEST_HOUR = 3            # Um 3 Uhr wird der Digest des Vortags erstellt
+DIGEST_TIMELAPSE = True    # Zusätzlich Zeitraffer erzeugen
+
+# Benachrichtigungen (None = deaktiviert)
+NOTIFY_WEBHOOK_URL = None   # z.B. "http://127.0.0.1:8099/" (python3 notifications.py --stub 8099)
+NOTIFY_MQTT_HOST = None     # z.B. "192.168.0.10"
+NOTIFY_MQTT_TOPIC = "doorbell/events"
+NOTIFY_SCRIPT = None        # Pfad zu einem Skript, erhält JSON über stdin
+
+# Föderation (mehrere Türklingeln in einem Dashboard)
+FEDERATION_ENABLED = True
+FEDERATION_INTERVAL = 30    # Sekunden zwischen zwei Abrufen bei den Peers
+
+# Datenbank-Pflege
+DB_KEEP_MONTHS = 6          # Ältere Events wandern in Monats-Archive (archive/)
+DB_MAINTENANCE_HOUR = 4     # Tägliches ANALYZE + Archivierung
+DB_VACUUM_INTERVAL = 60     # Sekunden zwischen zwei kleinen VACUUM-Schritten
+
+# Thread-Überwachung
+SHUTDOWN_TIMEOUT = 12       # Sekunden, die beim Beenden auf Threads/Aufnahmen gewartet wird
+
+# Temperatur-Einstellungen (Grove Temperature Sensor v1.2, Kennlinie in sensor_conversion.py)
+TEMP_CALIBRATION_OFFSET = 0.0   # Korrektur in °C für diesen Sensor
+TEMP_CACHE_SECONDS = 30         # Dashboard misst höchstens so oft neu (Messung dauert ~0.25s)
 
 # Globale Variablen
-sensor_active = True
+supervisor = Supervisor()  # Heartbeats, CPU-Zeit und Neustart aller Hintergrund-Threads
 last_button_state = True  # True = nicht gedrückt (wegen Pull-Up)
 recording_active = False  # Verhindert mehrere gleichzeitige Aufnahmen
-motion_times = []        # Zeitstempel für Bewegungen
+digests_running = set()   # Tage, deren Digest gerade gebaut wird
+temperature_cache = {"value": None, "time": None}  # Letzte Messung für das Dashboard
+temperature_lock = threading.Lock()  # Nur eine Messung gleichzeitig
 state_lock = threading.Lock()  # Lock für Thread-sichere Zugriffe
+response_cache = ResponseCache(max_entries=128)  # Seiten-/JSON-Cache, Version wird bei Event-Änderung erhöht
 
 BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = BASE_DIR / "smart_doorbell.db"
-VIDEO_DIR = BASE_DIR / "static" / "videos"
+# Über Umgebungsvariablen überschreibbar, z.B. für mehrere lokale Instanzen (Föderation).
+# Alle Daten einer Instanz liegen unter DATA_DIR (Standard: Ordner der Datenbank) -
+# zwei Instanzen teilen sich so weder Videos, Vorschaubilder noch Archive.
+DB_PATH = Path(os.environ.get("DOORBELL_DB")
+               or Path(os.environ.get("DOORBELL_DATA_DIR", BASE_DIR)) / "smart_doorbell.db")
+DATA_DIR = Path(os.environ.get("DOORBELL_DATA_DIR") or DB_PATH.parent)
+MEDIA_DIR = DATA_DIR / "static"  # Wird unter /static/ ausgeliefert (videos/, thumbnails/, digests/)
+VIDEO_DIR = MEDIA_DIR / "videos"
+THUMB_DIR = MEDIA_DIR / "thumbnails"
+DIGEST_DIR = MEDIA_DIR / "digests"
+ARCHIVE_DIR = DATA_DIR / "archive"
+QUARANTINE_DIR = DATA_DIR / "quarantine"
+MEDIA_SUBDIRS = ("videos/", "thumbnails/", "digests/")
+PORT = int(os.environ.get("DOORBELL_PORT", 5000))
 
 # Erstelle den Video-Ordner, falls nicht vorhanden
 VIDEO_DIR.mkdir(parents=True, exist_ok=True)
 
+def serve_static(filename):
+    """/static/: Medien der Instanz aus MEDIA_DIR, alles andere aus dem Programmordner"""
+    if filename.startswith(MEDIA_SUBDIRS):
+        return send_from_directory(MEDIA_DIR, filename)
+    return app.send_static_file(filename)
+
+app.view_functions["static"] = serve_static
+
 # Komponenten initialisieren
 button = Button("D2")        # Pi-Top Button an D2
 temp_sensor = LightSensor("A0")    # Analog-Reader für Grove Temperature Sensor an A0
+light_sensor = LightSensor(LIGHT_SENSOR_PORT) if LIGHT_SENSOR_PORT else None
+light_converter = SensorConverter(LIGHT_SENSOR_PORT) if LIGHT_SENSOR_PORT else None  # ADC-Code -> Prozent
+activity = adaptive_capture.ActivityTracker()  # PIR-Flanken + letzter motion_score
+temp_converter = SensorConverter("A0", temp_offset=TEMP_CALIBRATION_OFFSET)  # Tabelle für alle 1024 ADC-Werte
 recording_led = LED("D0")    # LED an D0 - leuchtet während Aufnahme
+camera = CameraBroker(VIDEO_DEVICE, fps=VIDEO_FPS, resolution=VIDEO_RESOLUTION,
+                      input_format=CAMERA_INPUT_FORMAT, live_fps=LIVE_FPS)
+
+def create_notifier():
+    """Erstellt den Notifier mit allen konfigurierten Sinks"""
+    sinks = []
+    try:
+        if NOTIFY_WEBHOOK_URL:
+            sinks.append(WebhookSink(NOTIFY_WEBHOOK_URL))
+        if NOTIFY_MQTT_HOST:
+            sinks.append(MqttSink(NOTIFY_MQTT_HOST, NOTIFY_MQTT_TOPIC))
+        if NOTIFY_SCRIPT:
+            sinks.append(ScriptSink(NOTIFY_SCRIPT))
+    except RuntimeError as e:
+        print(f"[NOTIFY] {e}")
+    return Notifier(DB_PATH, sinks)
+
+notifier = create_notifier()
+federation = Federation(DB_PATH, THUMB_DIR, on_change=response_cache.bump)
+DEFAULT_TRIGGER_RULES = [{
+    "name": "motion_burst",
+    "input": "motion",
+    "debounce": MOTION_COOLDOWN,
+    "count": MOTION_THRESHOLD,
+    "window": MOTION_TIMEFRAME,
+    "cooldown": MOTION_TRIGGER_COOLDOWN,
+    "action": {"record": "motion", "duration": VIDEO_DURATION_MOTION},
+}]
+rule_engine = RuleEngine(TRIGGER_RULES_PATH or BASE_DIR / "trigger_rules.json",
+                         default_rules=DEFAULT_TRIGGER_RULES, trace_path=TRIGGER_TRACE_PATH)
+reconciler = reconcile.Reconciler(DB_PATH, VIDEO_DIR, QUARANTINE_DIR, ARCHIVE_DIR,
+                                  on_change=response_cache.bump)
+db_maintenance = DbMaintenance(DB_PATH, ARCHIVE_DIR, keep_months=DB_KEEP_MONTHS,
+                               on_change=response_cache.bump)
 
 def init_gpio():
     """Initialisiert die GPIO-Pins für Pi-Top"""
@@ -85,36 +198,45 @@ def init_gpio():
         print(f"Fehler bei GPIO-Initialisierung: {e}")
         raise
 
-def _read_single_temperature():
-    """Einzelne Temperaturmessung vom Grove Temperature Sensor v1.2"""
-    raw = temp_sensor.reading  # 0-1023 (10-bit ADC)
-    analog_value = raw / 1023.0
-    if analog_value <= 0 or analog_value >= 1:
-        return None
-    R = TEMP_R0 * (1.0 / analog_value - 1.0)
-    return 1.0 / (math.log(R / TEMP_R0) / TEMP_B + 1.0 / 298.15) - 273.15
-
 def get_temperature():
     """Liest die Temperatur als Durchschnitt von 5 Messungen (~0.25s)"""
     try:
-        readings = []
+        raws = []
         for _ in range(5):
-            t = _read_single_temperature()
-            if t is not None:
-                readings.append(t)
+            raws.append(temp_sensor.reading)  # 0-1023 (10-bit ADC)
             time.sleep(0.05)
 
-        if not readings:
+        # Alle Rohwerte in einem Schritt umrechnen und mitteln (Tabelle statt log())
+        temperature, valid = temp_converter.mean_batch(raws)
+        if temperature is None:
             print("[TEMP] Keine gültigen Messwerte", flush=True)
             return None
 
-        temperature = sum(readings) / len(readings)
-        print(f"[TEMP] Durchschnitt: {temperature:.1f}°C ({len(readings)} Messungen)", flush=True)
+        print(f"[TEMP] Durchschnitt: {temperature:.1f}°C ({valid} Messungen)", flush=True)
         return round(temperature, 1)
     except Exception as e:
         print(f"[TEMP] Fehler bei Temperaturmessung: {e}", flush=True)
         return None
 
+def get_cached_temperature():
+    """Temperatur für das Dashboard - neu gemessen höchstens alle TEMP_CACHE_SECONDS"""
+    with temperature_lock:
+        now = time.monotonic()
+        if temperature_cache["time"] is None or now - temperature_cache["time"] >= TEMP_CACHE_SECONDS:
+            temperature_cache["value"] = get_temperature()
+            temperature_cache["time"] = now
+        return temperature_cache["value"]
+
+def get_light_level():
+    """Helligkeit in Prozent vom Lichtsensor (None ohne Sensor)"""
+    if light_sensor is None:
+        return None
+    try:
+        return light_converter.light(light_sensor.reading)  # 0-1023 -> 0-100 %
+    except Exception as e:
+        print(f"[LICHT] Fehler beim Lesen: {e}", flush=True)
+        return None
+
 def get_distance():
     """Misst die Distanz mit dem Ultraschallsensor"""
     try:
@@ -161,6 +283,8 @@ def record_video(event_type, duration):
         recording_active = True
 
     recording_led.on()
+    tmp_path = None
+    holding_camera = True  # Bis die Aufnahme fertig ist - danach darf die nächste starten
 
     try:
         timestamp = datetime.now(LOCAL_TZ)
@@ -168,34 +292,63 @@ def record_video(event_type, duration):
         time_str = timestamp.strftime("%H%M%S")
         filename = f"{event_type}_{date_str}{time_str}.mp4"
         video_path = VIDEO_DIR / filename
+        # Erst unter temporärem Namen schreiben - nur ein sauber beendeter Clip wird umbenannt
+        tmp_path = reconcile.part_path(video_path)
         
         print(f"[VIDEO] Starte {duration}s Videoaufnahme: {filename}")
         
-        cmd = [
-            'ffmpeg',
-            '-f', 'v4l2',
-            '-framerate', str(VIDEO_FPS),
-            '-video_size', VIDEO_RESOLUTION,
-            '-i', '/dev/video0',
-            '-t', str(duration),
-            '-vf', 'format=yuv420p',
-            '-c:v', 'libx264',
-            '-preset', 'ultrafast',
-            '-y',
-            str(video_path)
-        ]
-        
-        process = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            text=True,
-            timeout=duration + 5
-        )
-        
+        if ADAPTIVE_CAPTURE:
+            edges, last_score = activity.snapshot()
+            light_level = get_light_level()
+            profile = adaptive_capture.choose_profile(event_type, light_level, edges, last_score,
+                                                      trigger_edges=MOTION_THRESHOLD)
+            print(f"[VIDEO] Profil {profile} (Licht {light_level}, Flanken {edges}, Score {last_score})")
+            encode_args = adaptive_capture.encode_args(profile, tmp_path)
+        else:
+            encode_args = [
+                '-vf', 'format=yuv420p',
+                '-c:v', 'libx264',
+                '-preset', 'ultrafast',
+                '-y',
+                str(tmp_path)
+            ]
+
+        if camera.streaming():
+            # Kamera gehört dem Broker und liefert Frames - aus dem geteilten Stream kodieren
+            process = camera.record(encode_args, duration, timeout=5)
+        else:
+            # Broker liefert keine Frames (gestoppt oder ffmpeg scheitert) - Gerät direkt öffnen
+            cmd = [
+                'ffmpeg',
+                '-f', 'v4l2',
+                '-framerate', str(VIDEO_FPS),
+                '-video_size', VIDEO_RESOLUTION,
+                '-i', VIDEO_DEVICE,
+                '-t', str(duration),
+            ] + encode_args
+
+            process = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=duration + 5
+            )
+
         if process.returncode == 0:
+            reconcile.finalize(tmp_path, video_path)
             print(f"[VIDEO] Aufnahme erfolgreich gespeichert: {filename}")
+            # Aufnahme freigeben: Verifikation und DB-Eintrag dürfen kein Klingeln blockieren
+            recording_led.off()
+            recording_active = False
+            holding_camera = False
+            motion_score = None
+            if event_type == "motion" and MOTION_VERIFY_ENABLED:
+                filename, motion_score = verify_motion_clip(video_path)
+                activity.add_score(motion_score)
+                if filename is False:
+                    return None
             temperature = get_temperature()
-            add_event(event_type, filename, temperature)
+            add_event(event_type, filename, temperature, motion_score)
             return filename
         else:
             print(f"[VIDEO] Fehler bei Aufnahme: {process.stderr}")
@@ -208,93 +361,94 @@ def record_video(event_type, duration):
         print(f"[VIDEO] Fehler: {e}")
         return None
     finally:
-        recording_led.off()
-        recording_active = False
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)  # Abgebrochene Aufnahme nicht liegen lassen
+        if holding_camera:
+            recording_led.off()
+            recording_active = False
+
+def verify_motion_clip(video_path):
+    """Bewertet einen Motion-Clip und wendet MOTION_VERIFY_MODE an.
+
+    Gibt (dateiname, score) zurück; dateiname ist None wenn der Clip gelöscht
+    wurde und False wenn das ganze Event verworfen werden soll.
+    """
+    result = motion_verify.verify_clip(video_path)
+    if result is None:
+        return video_path.name, None  # Keine Analyse möglich -> Clip behalten
+
+    score = result["score"]
+    print(f"[VERIFY] Score {score:.4f} (ROI {result['roi']}, {result['elapsed']}s)")
+    if score >= MOTION_VERIFY_MIN_SCORE or MOTION_VERIFY_MODE == "keep":
+        return video_path.name, score
+
+    print(f"[VERIFY] Keine echte Bewegung (< {MOTION_VERIFY_MIN_SCORE}) -> {MOTION_VERIFY_MODE}")
+    try:
+        video_path.unlink()
+    except OSError as e:
+        print(f"[VERIFY] Clip konnte nicht gelöscht werden: {e}")
+    if MOTION_VERIFY_MODE == "discard":
+        return False, score
+    return None, score
 
 def button_pressed():
     """Callback für Button-Druck"""
     print(f"\n[🔔 BUTTON] Button an GPIO{BUTTON_PIN} wurde betätigt!")
+    notifier.notify("ring")  # Nur Queue - Zustellung im Notifier-Thread
     
     # Videoaufnahme starten (10 Sekunden)
-    video_thread = threading.Thread(
-        target=record_video, 
-        args=("ring", VIDEO_DURATION_BUTTON), 
-        daemon=True
-    )
-    video_thread.start()
+    supervisor.spawn("record_video", record_video, args=("ring", VIDEO_DURATION_BUTTON),
+                     timeout=VIDEO_DURATION_BUTTON + 30)
+
+def run_trigger_actions(actions):
+    """Führt die Aktionen ausgelöster Regeln aus (Aufnahme + Benachrichtigung)"""
+    for action in actions:
+        event_type = action.get("record")
+        if not event_type:
+            continue
+        duration = action.get("duration", VIDEO_DURATION_MOTION)
+        print(f"  ⚠️  REGEL '{action['rule']}' AUSGELÖST! Starte {duration}s Videoaufnahme")
+        notifier.notify(event_type, rule=action["rule"])
+
+        supervisor.spawn("record_video", record_video, args=(event_type, duration),
+                         timeout=duration + 30)
 
 def motion_thread():
     """Thread für PIR-Bewegungssensor - NUR bei Zustandsänderung"""
-    global motion_times
-
     print("Motion-Thread gestartet - Überwache Bewegungen")
 
     # WICHTIG: PIR Sensor braucht Zeit zum Kalibrieren!
     print("PIR Sensor kalibriert sich... 20 Sekunden warten")
     for i in range(20, 0, -1):
         print(f"  Kalibrierung: {i} Sekunden...", end='\r')
-        time.sleep(1)
+        if not supervisor.sleep(1):
+            return
     print("  Kalibrierung: Fertig!            ")
     print("PIR Sensor bereit - Reagiere NUR auf Zustandsänderungen")
 
-    # Variablen für Zustandsänderung und Cooldown
+    # Zustand für Flankenerkennung - Fenster und Cooldowns stecken in den Regeln
     last_state = False
-    cooldown_until = 0
     motion_count_total = 0
 
-    while sensor_active:
+    while supervisor.active():
         try:
             now = time.time()
             current_state = GPIO.input(PIR_PIN)
 
-            # Cooldown: Nach erkannter Bewegung 2 Sekunden Pause
-            if now < cooldown_until:
-                time.sleep(0.05)
-                continue
-
             # NUR bei WECHSEL von LOW zu HIGH (steigende Flanke)
             if current_state == True and last_state == False:
                 motion_count_total += 1
-
-                with state_lock:
-                    motion_times.append(now)
-                    # Alte Bewegungen entfernen (> MOTION_TIMEFRAME Sekunden)
-                    motion_times = [t for t in motion_times if now - t <= MOTION_TIMEFRAME]
-                    current_count = len(motion_times)
-
+                activity.add_edge(now)
                 print(f"\n[🏃 MOTION] Bewegung #{motion_count_total} um {now:.0f}")
-
-                # Cooldown setzen - verhindert Dauerfeuer
-                cooldown_until = now + MOTION_COOLDOWN
-
-                print(f"  Bewegungen in letzten {MOTION_TIMEFRAME}s: {current_count}/{MOTION_THRESHOLD}")
-
-                # Prüfen ob Schwellwert erreicht
-                if current_count >= MOTION_THRESHOLD:
-                    print(f"  ⚠️  SCHWELLE ERREICHT! Starte {VIDEO_DURATION_MOTION}s Videoaufnahme")
-
-                    video_thread = threading.Thread(
-                        target=record_video,
-                        args=("motion", VIDEO_DURATION_MOTION),
-                        daemon=True
-                    )
-                    video_thread.start()
-
-                    # Reset nach erfolgreicher Auslösung
-                    with state_lock:
-                        motion_times = []
-                    motion_count_total = 0
-
-                    # Extra langer Cooldown nach Video (8 Sekunden)
-                    cooldown_until = now + 8
+                run_trigger_actions(rule_engine.feed("motion", now=now))
 
             # Aktuellen Zustand für nächsten Durchlauf speichern
             last_state = current_state
-            time.sleep(0.05)  # 50ms Abtastrate
+            supervisor.sleep(0.05)  # 50ms Abtastrate
 
         except Exception as e:
             print(f"Fehler im Motion-Thread: {e}")
-            time.sleep(0.5)
+            supervisor.sleep(0.5)
 
 def button_thread():
     """Separater Thread für Button-Überwachung"""
@@ -302,7 +456,7 @@ def button_thread():
     
     print("Button-Thread gestartet - Sofortige Reaktion")
     
-    while sensor_active:
+    while supervisor.active():
         try:
             current_state = GPIO.input(BUTTON_PIN)
             
@@ -310,26 +464,99 @@ def button_thread():
                 button_pressed()
             
             last_button_state = current_state
-            time.sleep(0.05)
+            supervisor.sleep(0.05)
             
         except Exception as e:
             print(f"Fehler im Button-Thread: {e}")
-            time.sleep(0.1)
+            supervisor.sleep(0.1)
 
 def ultrasonic_thread():
     """Thread für regelmäßige Ultraschall-Messungen"""
     print("Ultraschall-Thread gestartet - Messung alle 2 Sekunden")
     
-    while sensor_active:
+    while supervisor.active():
         try:
             distance = get_distance()
             if distance is not None:
                 print(f"[📏 ULTRASCHALL] Distanz: {distance} cm")
-            time.sleep(2)
+                run_trigger_actions(rule_engine.feed("distance", distance))
+            supervisor.sleep(2)
             
         except Exception as e:
             print(f"Fehler im Ultraschall-Thread: {e}")
-            time.sleep(1)
+            supervisor.sleep(1)
+
+def run_digest(day):
+    """Baut den Digest eines Tages - wartet, solange eine Aufnahme läuft.
+
+    Pro Tag läuft höchstens ein Build (beide schreiben dieselbe .part-Datei).
+    """
+    with state_lock:
+        if day in digests_running:
+            print(f"[DIGEST] {day} wird bereits erstellt, überspringe...")
+            return
+        digests_running.add(day)
+    try:
+        while recording_active and supervisor.active():
+            supervisor.sleep(1)
+        digest.build_digest(day, timelapse=DIGEST_TIMELAPSE, db_path=DB_PATH,
+                            video_dir=VIDEO_DIR, digest_dir=DIGEST_DIR, progress=supervisor.beat)
+    except Exception as e:
+        print(f"[DIGEST] Fehler: {e}")
+    finally:
+        with state_lock:
+            digests_running.discard(day)
+
+def digest_thread():
+    """Thread für die tägliche Digest-Erstellung (Vortag, einmal pro Tag)"""
+    print(f"Digest-Thread gestartet - täglich um {DIGEST_HOUR}:00 Uhr")
+    last_run = None
+
+    while supervisor.active():
+        try:
+            now = datetime.now(LOCAL_TZ)
+            if now.hour >= DIGEST_HOUR and last_run != now.date():
+                yesterday = (now.date() - timedelta(days=1)).isoformat()
+                if digest.load_index(yesterday, digest_dir=DIGEST_DIR) is None:
+                    run_digest(yesterday)
+                last_run = now.date()
+            supervisor.sleep(60)
+        except Exception as e:
+            print(f"Fehler im Digest-Thread: {e}")
+            supervisor.sleep(60)
+
+def federation_thread():
+    """Thread für den regelmäßigen Abruf neuer Events von den Peers"""
+    print(f"Föderations-Thread gestartet - Abruf alle {FEDERATION_INTERVAL} Sekunden")
+
+    while supervisor.active():
+        try:
+            new_events = federation.sync_all()
+            if new_events:
+                print(f"[🌐 FÖDERATION] {new_events} neue Events von Peers")
+            supervisor.sleep(FEDERATION_INTERVAL)
+        except Exception as e:
+            print(f"Fehler im Föderations-Thread: {e}")
+            supervisor.sleep(FEDERATION_INTERVAL)
+
+def maintenance_thread():
+    """Thread für die Datenbank-Pflege - nur wenn gerade nicht aufgenommen wird"""
+    print(f"Wartungs-Thread gestartet - VACUUM-Schritte alle {DB_VACUUM_INTERVAL}s")
+    last_daily = None
+
+    while supervisor.active():
+        try:
+            if not recording_active:
+                db_maintenance.vacuum_step()
+                now = datetime.now(LOCAL_TZ)
+                if now.hour >= DB_MAINTENANCE_HOUR and last_daily != now.date():
+                    db_maintenance.archive_old_events(today=now.date())
+                    db_maintenance.analyze()
+                    last_daily = now.date()
+            supervisor.sleep(DB_VACUUM_INTERVAL)
+        except Exception as e:
+            print(f"Fehler im Wartungs-Thread: {e}")
+            supervisor.sleep(DB_VACUUM_INTERVAL)
 
 def init_db():
     conn = sqlite3.connect(DB_PATH)
@@ -341,19 +568,25 @@ def init_db():
                 timestamp TEXT NOT NULL,
                 event_type TEXT NOT NULL,
                 video_file TEXT,
-                temperature REAL
+                temperature REAL,
+                motion_score REAL
             )
         """)
-        # Migration: Spalte hinzufügen falls sie in alter DB fehlt
-        try:
-            c.execute("ALTER TABLE events ADD COLUMN temperature REAL")
-        except sqlite3.OperationalError:
-            pass  # Spalte existiert bereits
+        # Migration: Spalten hinzufügen falls sie in alter DB fehlen
+        for column in ("temperature REAL", "motion_score REAL"):
+            try:
+                c.execute(f"ALTER TABLE events ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass  # Spalte existiert bereits
+        # Index für Zeitbereichs-Abfragen (Dashboard, Export)
+        c.execute("CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp)")
+        # WAL: Leser (Export, Dashboard) blockieren die Inserts des Recorders nicht
+        c.execute("PRAGMA journal_mode=WAL")
         conn.commit()
     finally:
         conn.close()
 
-def add_event(event_type, video_filename=None, temperature=None):
+def add_event(event_type, video_filename=None, temperature=None, motion_score=None):
     """Fügt einen neuen Event-Eintrag in die Datenbank hinzu"""
     conn = sqlite3.connect(DB_PATH)
     try:
@@ -364,10 +597,11 @@ def add_event(event_type, video_filename=None, temperature=None):
             video_filename = video_filename + '.mp4'
 
         c.execute("""
-            INSERT INTO events (timestamp, event_type, video_file, temperature)
-            VALUES (?, ?, ?, ?)
-        """, (timestamp, event_type, video_filename, temperature))
+            INSERT INTO events (timestamp, event_type, video_file, temperature, motion_score)
+            VALUES (?, ?, ?, ?, ?)
+        """, (timestamp, event_type, video_filename, temperature, motion_score))
         conn.commit()
+        response_cache.bump()
         print(f"[📀 DATENBANK] Event hinzugefügt: {event_type} um {timestamp} ({temperature}°C)")
     finally:
         conn.close()
@@ -381,14 +615,14 @@ def get_events(limit=None):
 
         if limit:
             c.execute("""
-                SELECT id, timestamp, event_type, video_file, temperature
+                SELECT id, timestamp, event_type, video_file, temperature, motion_score
                 FROM events
                 ORDER BY timestamp DESC
                 LIMIT ?
             """, (limit,))
         else:
             c.execute("""
-                SELECT id, timestamp, event_type, video_file, temperature
+                SELECT id, timestamp, event_type, video_file, temperature, motion_score
                 FROM events
                 ORDER BY timestamp DESC
             """)
@@ -404,13 +638,15 @@ def get_event_by_id(event_id):
         conn.row_factory = sqlite3.Row
         c = conn.cursor()
         c.execute("""
-            SELECT id, timestamp, event_type, video_file, temperature
+            SELECT id, timestamp, event_type, video_file, temperature, motion_score
             FROM events
             WHERE id = ?
         """, (event_id,))
 
         row = c.fetchone()
-        return dict(row) if row else None
+        if row:
+            return dict(row)
+        return find_archived_event(event_id, ARCHIVE_DIR)  # Ältere Events liegen im Archiv
     finally:
         conn.close()
 
@@ -420,14 +656,11 @@ def get_event_stats():
     try:
         c = conn.cursor()
 
-        c.execute("SELECT COUNT(*) FROM events")
-        total = c.fetchone()[0]
-
-        c.execute("SELECT COUNT(*) FROM events WHERE event_type = 'ring'")
-        rings = c.fetchone()[0]
-
-        c.execute("SELECT COUNT(*) FROM events WHERE event_type = 'motion'")
-        motions = c.fetchone()[0]
+        # Zähler inklusive Monats-Archive, sonst sinken sie nach jeder Archivierung
+        counts = count_events(DB_PATH, ARCHIVE_DIR)
+        total = sum(counts.values())
+        rings = counts.get('ring', 0)
+        motions = counts.get('motion', 0)
 
         c.execute("SELECT timestamp FROM events ORDER BY timestamp DESC LIMIT 1")
         last_event = c.fetchone()
@@ -442,27 +675,234 @@ def get_event_stats():
     finally:
         conn.close()
 
+def cached_response(key, render, mimetype="text/html"):
+    """Liefert eine gecachte Antwort mit ETag oder 304, rendert nur bei Cache-Miss.
+
+    render() gibt (body, status) zurück; nur Status 200 wird gecacht.
+    """
+    version = response_cache.version
+    etag = response_cache.etag_for(key, version)
+
+    # Browser hat die aktuelle Version schon -> 304 ohne Rendern
+    if request.if_none_match.contains(etag) or request.if_none_match.contains(f"{etag}-gz"):
+        resp = Response(status=304)
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp
+
+    start = time.perf_counter()
+    body = response_cache.get(key, version)
+    cache_state = "hit"
+    if body is None:
+        cache_state = "miss"
+        body, status = render()
+        if status != 200:
+            return body, status
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        response_cache.put(key, version, body)
+
+    resp = Response(body, mimetype=mimetype)
+    # Render-Zeit im Browser (DevTools) sichtbar - für Vorher/Nachher-Vergleich
+    resp.headers["Server-Timing"] = f'render;desc="{cache_state}";dur={(time.perf_counter() - start) * 1000:.1f}'
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"  # immer revalidieren, ETag entscheidet
+    return resp
+
 @app.route("/")
 def dashboard():
     """Haupt-Dashboard mit Event-Buttons"""
-    events = get_events(limit=20)
-    stats = get_event_stats()
-    temperature = get_temperature()
-    return render_template("dashboard.html", events=events, stats=stats, temperature=temperature)
+    # Die Temperatur lädt die Seite separat über /api/temperature nach - so bleibt
+    # die gecachte Seite unabhängig vom Sensor und Treffer/304 kosten keine Messung
+    def render():
+        events = federation.merged_events(limit=20) if FEDERATION_ENABLED else get_events(limit=20)
+        stats = get_event_stats()
+        return render_template("dashboard.html", events=events, stats=stats), 200
+
+    return cached_response("dashboard", render)
+
+@app.route("/api/temperature")
+def api_temperature():
+    """Aktuelle Temperatur (höchstens TEMP_CACHE_SECONDS alt)"""
+    resp = jsonify({"temperature": get_cached_temperature()})
+    resp.headers["Cache-Control"] = f"max-age={TEMP_CACHE_SECONDS}"
+    return resp
 
 @app.route("/event/<int:event_id>")
 def event_detail(event_id):
     """Detailseite für ein spezifisches Event"""
-    event = get_event_by_id(event_id)
-    if not event:
-        return "Event nicht gefunden", 404
-    return render_template("event_detail.html", event=event)
+    def render():
+        event = get_event_by_id(event_id)
+        if not event:
+            return "Event nicht gefunden", 404
+        return render_template("event_detail.html", event=event), 200
+
+    return cached_response(("event", event_id), render)
 
 @app.route("/api/events/recent")
 def api_recent_events():
     """API für die neuesten Events"""
-    events = get_events(limit=10)
-    return jsonify(events)
+    def render():
+        events = get_events(limit=10)
+        return app.json.dumps(events), 200
+
+    return cached_response(("api_recent", 10), render, mimetype="application/json")
+
+@app.route("/api/events/export")
+def api_export_events():
+    """Streamt die Event-Historie (format=csv|ndjson|parquet|arrow, since, until, type)"""
+    fmt = request.args.get("format", "csv")
+    try:
+        chunks = export.export_events(
+            fmt,
+            DB_PATH,
+            since=request.args.get("since"),
+            until=request.args.get("until"),
+            event_types=request.args.getlist("type") or None,
+        )
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    mimetype, extension = export.FORMATS[fmt]
+    filename = f"events_{datetime.now(LOCAL_TZ).strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return Response(chunks, mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+@app.route("/digest")
+@app.route("/digest/<day>")
+def digest_view(day=None):
+    """Tages-Digest mit Kapitelliste, ohne Tag: Übersicht aller Digests"""
+    if day is not None:
+        try:
+            date.fromisoformat(day)
+        except ValueError:
+            return "Ungültiges Datum", 400
+    index = digest.load_index(day, digest_dir=DIGEST_DIR) if day else None
+    return render_template("digest.html", day=day, index=index,
+                           days=digest.list_digests(digest_dir=DIGEST_DIR))
+
+@app.route("/digest/<day>/build", methods=["POST"])
+def digest_build(day):
+    """Startet die Digest-Erstellung für einen Tag im Hintergrund"""
+    try:
+        date.fromisoformat(day)
+    except ValueError:
+        return jsonify({"status": "error", "message": "Ungültiges Datum"}), 400
+    if day in digests_running:
+        return jsonify({"status": "running", "day": day}), 409
+    supervisor.spawn("digest_build", run_digest, args=(day,))
+    return jsonify({"status": "queued", "day": day}), 202
+
+@app.route("/api/notifications")
+def api_notifications():
+    """Status der Benachrichtigungen (Outbox, Zustellungen, Latenz)"""
+    return jsonify(notifier.stats())
+
+@app.route("/api/maintenance")
+def api_maintenance():
+    """Status der Datenbank-Pflege (Größe, freie Seiten, Archive)"""
+    return jsonify(db_maintenance.stats())
+
+@app.route("/api/admin/threads")
+def api_admin_threads():
+    """Status aller Threads: Heartbeat, CPU-Zeit, Schleifen-Latenz, Neustarts"""
+    return jsonify(supervisor.status())
+
+@app.route("/api/admin/threads/<name>/restart", methods=["POST"])
+def api_admin_restart_thread(name):
+    """Startet einen Worker manuell neu"""
+    if not supervisor.restart(name):
+        return jsonify({"status": "error", "message": "Unbekannter Worker"}), 404
+    return jsonify({"status": "success", "worker": name}), 202
+
+@app.route("/api/rules")
+def api_rules():
+    """Aktive Trigger-Regeln mit Fenster-Zustand"""
+    return jsonify(rule_engine.status())
+
+@app.route("/api/reconcile")
+def api_reconcile():
+    """Ergebnis des letzten Abgleichs zwischen Videos und Events"""
+    return jsonify(reconciler.last_result or {"status": "pending"})
+
+@app.route("/live")
+def live_view():
+    """MJPEG Live-Ansicht aus dem geteilten Kamera-Stream"""
+    if not camera.streaming():
+        return "Kamera liefert keine Bilder", 503
+    return Response(camera.mjpeg_stream(), mimetype="multipart/x-mixed-replace; boundary=frame",
+                    headers={"Cache-Control": "no-store"})
+
+@app.route("/snapshot.jpg")
+def snapshot():
+    """Aktuelles Einzelbild der Kamera"""
+    frame = camera.snapshot()
+    if frame is None:
+        return "Kein aktuelles Bild verfügbar", 503
+    return Response(frame, mimetype="image/jpeg", headers={"Cache-Control": "no-store"})
+
+@app.route("/api/camera")
+def api_camera():
+    """Status des Kamera-Brokers (Viewer, Frames, Alter des letzten Bildes)"""
+    return jsonify(camera.status())
+
+@app.route("/api/events/since")
+def api_events_since():
+    """Inkrementeller Abruf für Peers: Events mit id > after_id, aufsteigend"""
+    after_id = request.args.get("after_id", 0, type=int)
+    limit = min(request.args.get("limit", 500, type=int), 1000)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("""
+            SELECT id, timestamp, event_type, video_file, temperature, motion_score
+            FROM events
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (after_id, limit)).fetchall()
+        return jsonify([dict(row) for row in rows])
+    finally:
+        conn.close()
+
+@app.route("/thumbnail/<int:event_id>.jpg")
+def thumbnail(event_id):
+    """Vorschaubild eines Events (wird beim ersten Abruf erzeugt)"""
+    event = get_event_by_id(event_id)
+    if not event or not event["video_file"]:
+        return "Kein Video", 404
+    video_file = event["video_file"] if event["video_file"].endswith(".mp4") else event["video_file"] + ".mp4"
+    thumb_path = THUMB_DIR / f"{event_id}.jpg"
+    if not make_thumbnail(VIDEO_DIR / video_file, thumb_path):
+        return "Vorschaubild nicht verfügbar", 404
+    return send_file(thumb_path, mimetype="image/jpeg", max_age=86400)
+
+@app.route("/api/federation/peers", methods=["GET", "POST"])
+def api_federation_peers():
+    """Peers auflisten oder registrieren (POST: name, url)"""
+    if request.method == "POST":
+        data = request.get_json(silent=True) or request.form
+        try:
+            federation.add_peer(data.get("name") or data.get("url", ""), data.get("url", ""))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        supervisor.spawn("federation_sync", federation.sync_all)
+        return jsonify({"status": "success", "peers": federation.get_peers()}), 201
+    return jsonify(federation.get_peers())
+
+@app.route("/api/federation/peers/<int:peer_id>", methods=["DELETE"])
+def api_federation_remove_peer(peer_id):
+    """Peer und seine gespeicherten Events entfernen"""
+    federation.remove_peer(peer_id)
+    return jsonify({"status": "success"})
+
+@app.route("/api/federation/timeline")
+def api_federation_timeline():
+    """Gemeinsame Timeline aller Knoten mit Herkunft"""
+    limit = min(request.args.get("limit", 50, type=int), 500)
+    return cached_response(("federation_timeline", limit),
+                           lambda: (app.json.dumps(federation.merged_events(limit)), 200),
+                           mimetype="application/json")
 
 @app.route("/add_event", methods=["POST"])
 def api_add_event():
@@ -477,12 +917,26 @@ def api_add_event():
             safe_type = secure_filename(event_type) or "unknown"
             video_filename = f"{safe_type}_{timestamp}.mp4"
             video_path = VIDEO_DIR / video_filename
-            video_file.save(video_path)
+            tmp_path = reconcile.part_path(video_path)
+            video_file.save(tmp_path)
+            reconcile.finalize(tmp_path, video_path)
     
     temperature = get_temperature()
     add_event(event_type, video_filename, temperature)
     return jsonify({"status": "success", "video_filename": video_filename, "temperature": temperature})
 
+def snapshot_database(target):
+    """Konsistente Kopie der Datenbank (inkl. WAL) per SQLite-Backup-API"""
+    source = sqlite3.connect(DB_PATH)
+    try:
+        dest = sqlite3.connect(target)
+        try:
+            source.backup(dest)
+        finally:
+            dest.close()
+    finally:
+        source.close()
+
 @app.route("/backup", methods=["POST"])
 def backup():
     """Erstellt ein Backup auf dem zweiten Pi-Top (192.168.0.236)"""
@@ -503,14 +957,18 @@ def backup():
             capture_output=True, text=True, timeout=10
         )
 
-        # Datenbank kopieren
-        result_db = subprocess.run(
-            ["sshpass", "-p", BACKUP_PASS, "scp",
-             "-o", "StrictHostKeyChecking=no",
-             str(DB_PATH),
-             f"{BACKUP_USER}@{BACKUP_HOST}:{BACKUP_DIR}/smart_doorbell.db"],
-            capture_output=True, text=True, timeout=30
-        )
+        # Datenbank kopieren - erst eine konsistente Kopie ziehen: im WAL-Modus
+        # stehen neue Events bis zum Checkpoint nur in der -wal-Datei
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot = Path(tmp) / "smart_doorbell.db"
+            snapshot_database(snapshot)
+            result_db = subprocess.run(
+                ["sshpass", "-p", BACKUP_PASS, "scp",
+                 "-o", "StrictHostKeyChecking=no",
+                 str(snapshot),
+                 f"{BACKUP_USER}@{BACKUP_HOST}:{BACKUP_DIR}/smart_doorbell.db"],
+                capture_output=True, text=True, timeout=30
+            )
         if result_db.returncode != 0:
             errors.append(f"DB: {result_db.stderr.strip()}")
 
@@ -545,8 +1003,11 @@ def test_sensors():
     motion_state = GPIO.input(PIR_PIN)
     temperature = get_temperature()
 
-    with state_lock:
-        motion_count = len(motion_times)
+    rules_html = "".join(
+        f"<p>{r['name']} ({r['input']}): <strong>{r['window_count']}/{r['count']}</strong>"
+        f" in {r['window']:.0f}s &middot; ausgelöst: {r['fired']}</p>"
+        for r in rule_engine.status()
+    )
 
     temp_display = f"{temperature}°C" if temperature is not None else "N/A"
 
@@ -581,7 +1042,10 @@ def test_sensors():
             <h3>🏃 PIR Motion</h3>
             <p>Status: <strong class="{'red' if motion_state else 'green'}">
                 {'BEWEGUNG' if motion_state else 'KEINE'}</strong></p>
-            <p>Bewegungen (letzte {MOTION_TIMEFRAME}s): <strong>{motion_count}/{MOTION_THRESHOLD}</strong></p>
+        </div>
+        <div class="sensor">
+            <h3>⚙️ Trigger-Regeln</h3>
+            {rules_html}
         </div>
         <p><a href="/">⬅ Zurück zum Dashboard</a></p>
     </body>
@@ -619,10 +1083,11 @@ def debug_temp():
     return jsonify(info)
 
 def cleanup():
-    """Aufräumen bei Programmende"""
-    global sensor_active
-    sensor_active = False
-    time.sleep(2)
+    """Aufräumen bei Programmende - wartet begrenzt auf Threads statt fest 2s"""
+    supervisor.shutdown(timeout=SHUTDOWN_TIMEOUT)  # Worker wecken, laufende Aufnahmen abwarten
+    camera.stop()
+    notifier.stop()
+    supervisor.join_watched(timeout=2)
     
     try:
         recording_led.off()
@@ -642,41 +1107,54 @@ if __name__ == "__main__":
             print("   Installiere: sudo apt install ffmpeg")
         
         # Prüfe Webcam
-        if os.path.exists('/dev/video0'):
+        if os.path.exists(VIDEO_DEVICE):
             print("✓ Webcam gefunden")
+            camera.start()
         else:
             print("⚠️ Keine Webcam unter /dev/video0 gefunden!")
         
         # Initialisiere
         init_db()
+        response_cache.state = SqliteDataVersion(DB_PATH)  # Schreibzugriffe anderer Prozesse erkennen
+        federation.init_db()
+        db_maintenance.enable_incremental_vacuum()
+        reconciler.init_db()
+        assets.build()
+        notifier.start()
         init_gpio()
         
-        # Threads starten
-        threads = [
-            threading.Thread(target=button_thread, daemon=True),
-            threading.Thread(target=ultrasonic_thread, daemon=True),
-            threading.Thread(target=motion_thread, daemon=True),
-        ]
-        
-        for t in threads:
-            t.start()
+        # Threads beim Supervisor anmelden (stall_timeout = max. Sekunden ohne Heartbeat)
+        supervisor.register("button", button_thread, stall_timeout=5)
+        supervisor.register("ultrasonic", ultrasonic_thread, stall_timeout=10)
+        supervisor.register("motion", motion_thread, stall_timeout=5)
+        supervisor.register("digest", digest_thread, stall_timeout=120)      # Lange ffmpeg-Schritte melden sich per beat()
+        supervisor.register("maintenance", maintenance_thread, stall_timeout=900)
+        supervisor.register("reconcile", reconciler.run, oneshot=True)      # Einmaliger Abgleich im Hintergrund
+        if FEDERATION_ENABLED:
+            supervisor.register("federation", federation_thread, stall_timeout=300)
+        supervisor.watch("camera_broker", camera.thread)
+        supervisor.watch("notifier", notifier.thread)
+        supervisor.start()
         
         print("\n" + "="*70)
         print("🏠 SMART DOORBELL SYSTEM - ALL SENSORS ACTIVE")
         print("="*70)
-        print("📊 Dashboard: http://localhost:5000/")
-        print("🔍 Sensor Test: http://localhost:5000/test_sensors")
-        print("🌡️ Temp Debug:  http://localhost:5000/debug_temp")
+        print(f"📊 Dashboard: http://localhost:{PORT}/")
+        print(f"🔍 Sensor Test: http://localhost:{PORT}/test_sensors")
+        print(f"🌡️ Temp Debug:  http://localhost:{PORT}/debug_temp")
+        print(f"📹 Live-Ansicht: http://localhost:{PORT}/live")
+        print(f"🎞️ Digest:       http://localhost:{PORT}/digest")
+        print(f"🧵 Threads:      http://localhost:{PORT}/api/admin/threads")
         print("\n🎯 AKTIONEN:")
         print(f"  • Button (D2)       → 10s Video (ring event)")
-        print(f"  • PIR Motion (D4)   → {MOTION_THRESHOLD}x in {MOTION_TIMEFRAME}s → 5s Video (motion event)")
+        print(f"  • PIR Motion (D4)   → Regeln aus trigger_rules.json (Standard: {MOTION_THRESHOLD}x in {MOTION_TIMEFRAME}s → 5s Video)")
         print(f"  • Ultraschall (D7)  → Distanzmessung alle 2s")
         print(f"  • Temperatur (A0)   → Grove Temperature Sensor v1.2")
         print("\n" + "="*70)
         print("Drücke Strg+C zum Beenden")
         print("="*70 + "\n")
         
-        app.run(host="0.0.0.0", port=5000, debug=False, use_reloader=False)
+        app.run(host="0.0.0.0", port=PORT, debug=False, use_reloader=False)
         
     except KeyboardInterrupt:
         print("\n\nProgramm wird beendet...")
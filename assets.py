@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Statische Asset-Pipeline: Minifizieren, Content-Hash, Vorkomprimierung.
+
+Beim Start werden CSS/JS aus static/ nach static/dist/ gebaut:
+    css/style.css -> dist/css/style.<hash>.css (+ .gz, + .br falls brotli da)
+url_for('static', filename='css/style.css') zeigt danach automatisch auf die
+gehashte Datei, die mit "immutable" ausgeliefert wird.
+
+Aufruf als Skript zeigt die Seitengewichte vorher/nachher:
+    python3 assets.py
+"""
+import gzip
+import hashlib
+import re
+from pathlib import Path
+
+from flask import request, send_file
+
+try:
+    import brotli
+except ImportError:  # optional - ohne brotli nur gzip
+    brotli = None
+
+BASE_DIR = Path(__file__).resolve().parent
+STATIC_DIR = BASE_DIR / "static"
+DIST_DIR = STATIC_DIR / "dist"
+ASSET_SUFFIXES = (".css", ".js")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+JSON_GZIP_MIN_SIZE = 512  # Kleine JSON-Antworten lohnen keine Kompression
+
+# Originalname -> gehashter Name (relativ zu static/)
+manifest = {}
+# Gehashter Name -> {"gzip": Path, "br": Path}
+_encoded = {}
+
+
+def minify_css(css):
+    """Einfacher, konservativer CSS-Minifier (Kommentare, Leerraum)"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)  # nur NACH ':' - "div :hover" bleibt intakt
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def _build_one(src):
+    rel = src.relative_to(STATIC_DIR).as_posix()
+    data = src.read_bytes()
+    if src.suffix == ".css":
+        data = minify_css(data.decode("utf-8")).encode("utf-8")
+    # JS wird nur gehasht und komprimiert - ohne echten Parser kein Minifizieren
+
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    hashed_rel = f"dist/{Path(rel).with_suffix('').as_posix()}.{digest}{src.suffix}"
+    target = STATIC_DIR / hashed_rel
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    encoded = {}
+    if not target.exists():
+        target.write_bytes(data)
+    gz_path = target.with_name(target.name + ".gz")
+    if not gz_path.exists():
+        gz_path.write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    encoded["gzip"] = gz_path
+    if brotli is not None:
+        br_path = target.with_name(target.name + ".br")
+        if not br_path.exists():
+            br_path.write_bytes(brotli.compress(data, quality=11))
+        encoded["br"] = br_path
+
+    manifest[rel] = hashed_rel
+    _encoded[hashed_rel] = encoded
+    return rel, hashed_rel
+
+
+def build():
+    """Baut alle Assets und füllt das Manifest. Gibt das Manifest zurück."""
+    manifest.clear()
+    _encoded.clear()
+    for src in sorted(STATIC_DIR.rglob("*")):
+        if not src.is_file() or src.suffix not in ASSET_SUFFIXES:
+            continue
+        if DIST_DIR in src.parents:
+            continue
+        try:
+            _build_one(src)
+        except Exception as e:
+            print(f"[ASSETS] Fehler bei {src.name}: {e}", flush=True)
+    print(f"[ASSETS] {len(manifest)} Assets gebaut ({'gzip+brotli' if brotli else 'gzip'})", flush=True)
+    return dict(manifest)
+
+
+def _accepted(encoding):
+    return encoding in request.accept_encodings
+
+
+def init_app(app):
+    """Registriert url_for-Umschreibung und Kompression an der Flask-App"""
+
+    @app.url_defaults
+    def _hashed_static(endpoint, values):
+        if endpoint == "static":
+            filename = values.get("filename")
+            if filename in manifest:
+                values["filename"] = manifest[filename]
+
+    @app.after_request
+    def _compress(response):
+        if request.endpoint == "static":
+            return _serve_precompressed(response)
+        if response.mimetype == "application/json":
+            return _gzip_json(response)
+        return response
+
+
+def _serve_precompressed(response):
+    filename = (request.view_args or {}).get("filename")
+    encoded = _encoded.get(filename)
+    if encoded is None or response.status_code != 200:
+        return response
+
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE
+    response.vary.add("Accept-Encoding")
+    for encoding in ("br", "gzip"):
+        path = encoded.get(encoding)
+        if path is not None and _accepted(encoding):
+            compressed = send_file(path, mimetype=response.mimetype, conditional=False, etag=False)
+            compressed.headers["Content-Encoding"] = encoding
+            compressed.headers["Cache-Control"] = IMMUTABLE_CACHE
+            compressed.vary.add("Accept-Encoding")
+            compressed.set_etag(f"{filename}-{encoding}")
+            response.close()  # Datei-Handle der unkomprimierten Antwort freigeben
+            return compressed
+    return response
+
+
+def _gzip_json(response):
+    if (response.direct_passthrough or response.status_code != 200
+            or "Content-Encoding" in response.headers or not _accepted("gzip")):
+        return response
+    data = response.get_data()
+    if len(data) < JSON_GZIP_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6, mtime=0))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    etag, weak = response.get_etag()
+    if etag:
+        # Andere Repräsentation -> eigener starker ETag
+        response.set_etag(f"{etag}-gz", weak=weak)
+    return response
+
+
+def report():
+    """Zeigt Seitengewicht vorher/nachher für alle Assets"""
+    build()
+    print(f"{'Asset':<30} {'Original':>10} {'Minified':>10} {'gzip':>10} {'brotli':>10}")
+    for rel, hashed_rel in manifest.items():
+        original = (STATIC_DIR / rel).stat().st_size
+        minified = (STATIC_DIR / hashed_rel).stat().st_size
+        gz = _encoded[hashed_rel]["gzip"].stat().st_size
+        br = _encoded[hashed_rel]["br"].stat().st_size if "br" in _encoded[hashed_rel] else None
+        print(f"{rel:<30} {original:>10} {minified:>10} {gz:>10} {br if br is not None else '-':>10}")
+
+
+if __name__ == "__main__":
+    report()
@@ -0,0 +1,234 @@
+"""Gemeinsamer Kamera-Zugriff für Aufnahme, Live-Ansicht und Snapshots.
+
+Ein einziger ffmpeg-Prozess öffnet /dev/video0 und liefert MJPEG-Frames über
+eine Pipe. Der Broker hält immer den neuesten Frame in einem geteilten Puffer:
+- Live-Viewer (/live) und Snapshots lesen nur diesen Puffer - jeder weitere
+  Viewer kostet weder Capture noch Encoding.
+- Aufnahmen abonnieren eine begrenzte Queue und speisen die Frames in einen
+  eigenen ffmpeg-Encoder (nur für die Dauer der Aufnahme).
+"""
+import os
+import queue
+import subprocess
+import threading
+import time
+
+JPEG_SOI = b"\xff\xd8"
+JPEG_EOI = b"\xff\xd9"
+READ_CHUNK = 65536
+MAX_BUFFER = 4 * 1024 * 1024  # Schutz gegen kaputten Stream ohne Frame-Ende
+
+
+class CameraBroker:
+    """Besitzt das v4l2-Gerät und verteilt die Frames an alle Konsumenten"""
+
+    def __init__(self, device="/dev/video0", fps=30, resolution="640x480",
+                 input_format="mjpeg", live_fps=10):
+        self.device = device
+        self.fps = fps
+        self.resolution = resolution
+        self.input_format = input_format  # "mjpeg" = Kamera liefert JPEG, kein Encoding nötig
+        self.live_fps = live_fps
+
+        self.running = False
+        self.viewers = 0
+        self.frames_captured = 0
+        self._frame = None
+        self._frame_seq = 0
+        self._frame_time = 0.0
+        self._cond = threading.Condition()
+        self._subscribers = []
+        self._sub_lock = threading.Lock()
+        self._process = None
+        self._thread = None
+
+    # ----- Capture -----
+
+    def _capture_cmd(self):
+        cmd = ['ffmpeg', '-v', 'error', '-f', 'v4l2']
+        if self.input_format:
+            cmd += ['-input_format', self.input_format]
+        cmd += [
+            '-framerate', str(self.fps),
+            '-video_size', self.resolution,
+            '-i', self.device,
+        ]
+        if self.input_format == "mjpeg":
+            cmd += ['-c:v', 'copy']          # Frames der Kamera direkt durchreichen
+        else:
+            cmd += ['-c:v', 'mjpeg', '-q:v', '5']  # Einmal kodieren für alle Konsumenten
+        cmd += ['-f', 'mjpeg', '-']
+        return cmd
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="camera_broker", daemon=True)
+        self._thread.start()
+
+    @property
+    def thread(self):
+        """Worker-Thread (für die Thread-Überwachung)"""
+        return self._thread
+
+    def stop(self):
+        self.running = False
+        process = self._process
+        if process and process.poll() is None:
+            process.terminate()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _capture_loop(self):
+        print(f"[KAMERA] Broker gestartet ({self.device}, {self.resolution}@{self.fps})", flush=True)
+        while self.running:
+            try:
+                self._process = subprocess.Popen(
+                    self._capture_cmd(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+                )
+                self._read_frames(self._process.stdout.fileno())
+                self._process.wait(timeout=5)
+                if self.running and self.frames_captured == 0 and self.input_format:
+                    # Kamera kann das Format offenbar nicht - Rohformat versuchen, Broker kodiert selbst
+                    print(f"[KAMERA] Kein Frame mit input_format={self.input_format} - versuche Rohformat",
+                          flush=True)
+                    self.input_format = ""
+            except Exception as e:
+                print(f"[KAMERA] Fehler: {e}", flush=True)
+            if self.running:
+                print("[KAMERA] Capture beendet - Neustart in 2 Sekunden", flush=True)
+                time.sleep(2)
+
+    def _read_frames(self, fd):
+        buf = bytearray()
+        while self.running:
+            chunk = os.read(fd, READ_CHUNK)
+            if not chunk:
+                return
+            buf += chunk
+            while True:
+                start = buf.find(JPEG_SOI)
+                if start < 0:
+                    buf.clear()
+                    break
+                end = buf.find(JPEG_EOI, start + 2)
+                if end < 0:
+                    if start:
+                        del buf[:start]
+                    break
+                self._publish(bytes(buf[start:end + 2]))
+                del buf[:end + 2]
+            if len(buf) > MAX_BUFFER:
+                buf.clear()
+
+    def _publish(self, frame):
+        with self._cond:
+            self._frame = frame
+            self._frame_seq += 1
+            self._frame_time = time.time()
+            self.frames_captured += 1
+            self._cond.notify_all()
+        with self._sub_lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(frame)
+            except queue.Full:
+                pass  # Langsamer Konsument verliert Frames, bremst aber nie den Capture
+
+    # ----- Konsumenten -----
+
+    def streaming(self, max_age=2.0):
+        """True, wenn der Capture tatsächlich Frames liefert.
+
+        running sagt nur, dass der Capture-Thread läuft - scheitert ffmpeg (z.B.
+        falsches input_format), startet er endlos neu, ohne je ein Bild zu liefern.
+        """
+        with self._cond:
+            return self._frame is not None and time.time() - self._frame_time <= max_age
+
+    def snapshot(self, max_age=2.0):
+        """Neuester Frame als JPEG-Bytes (oder None, wenn zu alt/nicht vorhanden)"""
+        with self._cond:
+            if self._frame is None or time.time() - self._frame_time > max_age:
+                return None
+            return self._frame
+
+    def wait_frame(self, last_seq, timeout=2.0):
+        """Wartet auf einen Frame, der neuer ist als last_seq"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._frame_seq != last_seq or not self.running, timeout):
+                return None, last_seq
+            return self._frame, self._frame_seq
+
+    def mjpeg_stream(self):
+        """Generator für multipart/x-mixed-replace (MJPEG Live-Ansicht)"""
+        interval = 1.0 / self.live_fps
+        seq = 0
+        with self._cond:
+            self.viewers += 1
+        try:
+            while self.running:
+                frame, seq = self.wait_frame(seq)
+                if frame is None:
+                    continue
+                yield (b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                       + str(len(frame)).encode() + b"\r\n\r\n" + frame + b"\r\n")
+                time.sleep(interval)
+        finally:
+            with self._cond:
+                self.viewers -= 1
+
+    def record(self, output_args, duration, timeout):
+        """Nimmt duration Sekunden aus dem geteilten Stream auf.
+
+        output_args sind die Encoder-/Ausgabe-Argumente für ffmpeg. Gibt ein
+        subprocess.CompletedProcess zurück (wie subprocess.run).
+        """
+        q = queue.Queue(maxsize=self.fps * 2)
+        cmd = ['ffmpeg', '-v', 'error', '-f', 'mjpeg', '-framerate', str(self.fps), '-i', '-'] + list(output_args)
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.PIPE)
+        with self._sub_lock:
+            self._subscribers.append(q)
+        try:
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                try:
+                    frame = q.get(timeout=1.0)
+                except queue.Empty:
+                    if not self.running:
+                        break
+                    continue
+                process.stdin.write(frame)
+        except BrokenPipeError:
+            pass
+        finally:
+            with self._sub_lock:
+                self._subscribers.remove(q)
+        try:
+            # communicate() schließt stdin und liest stderr mit Timeout - ein hängender
+            # Encoder blockiert die Aufnahme nicht endlos
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        return subprocess.CompletedProcess(cmd, process.returncode, "", stderr.decode("utf-8", "replace"))
+
+    def status(self):
+        with self._cond:
+            age = time.time() - self._frame_time if self._frame is not None else None
+        with self._sub_lock:
+            recorders = len(self._subscribers)
+        return {
+            "running": self.running,
+            "streaming": self.streaming(),
+            "input_format": self.input_format or "raw",
+            "device": self.device,
+            "frames_captured": self.frames_captured,
+            "last_frame_age": round(age, 2) if age is not None else None,
+            "viewers": self.viewers,
+            "recorders": recorders,
+        }
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Datenbank-Pflege: inkrementelles VACUUM, ANALYZE und Monats-Archive.
+
+- auto_vacuum=INCREMENTAL wird einmalig aktiviert; freie Seiten werden danach
+  in kleinen Schritten (VACUUM_STEP_PAGES) zurückgegeben, wenn nichts aufnimmt.
+- ANALYZE/PRAGMA optimize hält die Statistiken des Query-Planers aktuell.
+- Events älter als KEEP_MONTHS Monate wandern in archive/events_YYYYMM.db.
+  Export, Zähler und Event-Suche lesen die Archive einzeln nacheinander.
+
+Aufruf als Skript führt alle Schritte einmal aus:
+    python3 db_maintenance.py [--keep-months 6]
+"""
+import sqlite3
+from datetime import date
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+DB_PATH = BASE_DIR / "smart_doorbell.db"
+ARCHIVE_DIR = BASE_DIR / "archive"
+
+KEEP_MONTHS = 6           # So viele Monate bleiben in der Haupt-DB
+VACUUM_STEP_PAGES = 64    # Seiten pro inkrementellem VACUUM-Schritt (~256 KB)
+
+EVENT_COLUMNS = "id, timestamp, event_type, video_file, temperature, motion_score"
+
+
+def archive_path(month, archive_dir=ARCHIVE_DIR):
+    """Pfad der Archiv-DB für einen Monat im Format YYYY-MM"""
+    return archive_dir / f"events_{month.replace('-', '')}.db"
+
+
+def list_archives(archive_dir=ARCHIVE_DIR):
+    """Alle Archiv-Monate (YYYY-MM), älteste zuerst"""
+    if not archive_dir.exists():
+        return []
+    months = []
+    for path in sorted(archive_dir.glob("events_??????.db")):
+        stamp = path.stem[len("events_"):]
+        months.append(f"{stamp[:4]}-{stamp[4:]}")
+    return months
+
+
+def cutoff_month(keep_months=KEEP_MONTHS, today=None):
+    """Erster Monat (YYYY-MM), der noch in der Haupt-DB bleibt"""
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - keep_months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def archive_months(archive_dir=ARCHIVE_DIR, since=None, until=None):
+    """Archiv-Monate eines Zeitbereichs (Strings wie in events.timestamp), älteste zuerst"""
+    return [m for m in list_archives(archive_dir)
+            if (since is None or m >= since[:7]) and (until is None or m <= until[:7])]
+
+
+_archive_counts = {}  # Pfad -> (mtime, {event_type: Anzahl}); Archive ändern sich selten
+
+
+def _archive_type_counts(path):
+    mtime = path.stat().st_mtime
+    cached = _archive_counts.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    conn = sqlite3.connect(path)
+    try:
+        counts = dict(conn.execute("SELECT event_type, COUNT(*) FROM events GROUP BY event_type"))
+    finally:
+        conn.close()
+    _archive_counts[path] = (mtime, counts)
+    return counts
+
+
+def count_events(db_path=DB_PATH, archive_dir=ARCHIVE_DIR):
+    """Anzahl Events pro Typ über Haupt-DB und alle Archive"""
+    conn = sqlite3.connect(db_path)
+    try:
+        counts = dict(conn.execute("SELECT event_type, COUNT(*) FROM events GROUP BY event_type"))
+    finally:
+        conn.close()
+    for month in list_archives(archive_dir):
+        for event_type, count in _archive_type_counts(archive_path(month, archive_dir)).items():
+            counts[event_type] = counts.get(event_type, 0) + count
+    return counts
+
+
+def find_archived_event(event_id, archive_dir=ARCHIVE_DIR):
+    """Sucht ein Event per ID in den Archiven (neueste zuerst)"""
+    for month in reversed(list_archives(archive_dir)):
+        conn = sqlite3.connect(archive_path(month, archive_dir))
+        try:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(f"SELECT {EVENT_COLUMNS} FROM events WHERE id = ?", (event_id,)).fetchone()
+            if row:
+                return dict(row)
+        finally:
+            conn.close()
+    return None
+
+
+class DbMaintenance:
+    """Führt die Pflege-Schritte aus; jeder Schritt ist kurz und einzeln aufrufbar"""
+
+    def __init__(self, db_path=DB_PATH, archive_dir=ARCHIVE_DIR, keep_months=KEEP_MONTHS, on_change=None):
+        self.db_path = db_path
+        self.archive_dir = archive_dir
+        self.keep_months = keep_months
+        self.on_change = on_change  # z.B. Cache-Invalidierung nach Archivierung
+        self.last_analyze = None
+        self.last_archive = None
+        self.pages_freed = 0
+        self.events_archived = 0
+
+    def enable_incremental_vacuum(self):
+        """Aktiviert auto_vacuum=INCREMENTAL (einmaliges VACUUM bei alter DB)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if mode != 2:
+                print("[DB] Aktiviere auto_vacuum=INCREMENTAL (einmaliges VACUUM)...", flush=True)
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+    def vacuum_step(self, pages=VACUUM_STEP_PAGES):
+        """Gibt bis zu 'pages' freie Seiten zurück. Gibt die Anzahl zurück."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free == 0:
+                return 0
+            step = min(free, pages)
+            conn.execute(f"PRAGMA incremental_vacuum({int(step)})").fetchall()
+            self.pages_freed += step
+            return step
+        finally:
+            conn.close()
+
+    def analyze(self):
+        """Aktualisiert die Statistiken des Query-Planers"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA optimize")
+        finally:
+            conn.close()
+        self.last_analyze = date.today().isoformat()
+
+    def archive_old_events(self, today=None):
+        """Verschiebt Events vor dem Stichtag in Monats-Archive. Gibt die Anzahl zurück."""
+        cutoff = cutoff_month(self.keep_months, today)
+        conn = sqlite3.connect(self.db_path)
+        moved = 0
+        try:
+            months = [row[0] for row in conn.execute("""
+                SELECT DISTINCT substr(timestamp, 1, 7) FROM events
+                WHERE timestamp < ? ORDER BY 1
+            """, (f"{cutoff}-01",))]
+            if months:
+                self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+            for month in months:
+                conn.execute("ATTACH DATABASE ? AS arch", (str(archive_path(month, self.archive_dir)),))
+                try:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS arch.events (
+                            id INTEGER PRIMARY KEY,
+                            timestamp TEXT NOT NULL,
+                            event_type TEXT NOT NULL,
+                            video_file TEXT,
+                            temperature REAL,
+                            motion_score REAL
+                        )
+                    """)
+                    conn.execute("CREATE INDEX IF NOT EXISTS arch.idx_events_timestamp ON events(timestamp)")
+                    bounds = (f"{month}-01", f"{month}-99")
+                    # OR IGNORE: Zeilen eines abgebrochenen Laufs stehen schon im Archiv
+                    conn.execute(f"""
+                        INSERT OR IGNORE INTO arch.events ({EVENT_COLUMNS})
+                        SELECT {EVENT_COLUMNS} FROM main.events
+                        WHERE timestamp >= ? AND timestamp < ?
+                    """, bounds)
+                    # Nur löschen, was nachweislich im Archiv steht - ein fremdes Event mit
+                    # gleicher ID (ignoriert beim INSERT) bleibt in der Haupt-DB
+                    cur = conn.execute("""
+                        DELETE FROM main.events
+                        WHERE timestamp >= ? AND timestamp < ?
+                          AND EXISTS (SELECT 1 FROM arch.events a
+                                      WHERE a.id = main.events.id
+                                        AND a.timestamp = main.events.timestamp
+                                        AND a.event_type = main.events.event_type)
+                    """, bounds)
+                    deleted = cur.rowcount
+                    kept = conn.execute("""
+                        SELECT COUNT(*) FROM main.events WHERE timestamp >= ? AND timestamp < ?
+                    """, bounds).fetchone()[0]
+                    conn.commit()
+                    moved += deleted
+                    print(f"[DB] {deleted} Events aus {month} archiviert", flush=True)
+                    if kept:
+                        print(f"[DB] ⚠️ {kept} Events aus {month} kollidieren mit anderen IDs im Archiv "
+                              f"und bleiben in der Haupt-DB", flush=True)
+                finally:
+                    conn.execute("DETACH DATABASE arch")
+        finally:
+            conn.close()
+
+        self.last_archive = date.today().isoformat()
+        self.events_archived += moved
+        if moved and self.on_change:
+            self.on_change()
+        return moved
+
+    def stats(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        finally:
+            conn.close()
+        return {
+            "size_bytes": page_size * page_count,
+            "free_pages": free,
+            "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(auto_vacuum, auto_vacuum),
+            "pages_freed": self.pages_freed,
+            "events_archived": self.events_archived,
+            "archives": list_archives(self.archive_dir),
+            "last_analyze": self.last_analyze,
+            "last_archive": self.last_archive,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Datenbank-Pflege")
+    parser.add_argument("--keep-months", type=int, default=KEEP_MONTHS)
+    parser.add_argument("--db", default=str(DB_PATH))
+    args = parser.parse_args()
+
+    maintenance = DbMaintenance(Path(args.db), keep_months=args.keep_months)
+    maintenance.enable_incremental_vacuum()
+    maintenance.archive_old_events()
+    while maintenance.vacuum_step():
+        pass
+    maintenance.analyze()
+    print(maintenance.stats())
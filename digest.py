@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Tages-Digest: alle Clips eines Tages als ein Video (ohne Re-Encoding).
+
+Die Clips werden per ffmpeg concat-Demuxer mit Stream-Copy aneinandergehängt.
+Alle Aufnahme-Profile nutzen dieselbe Auflösung und Bildrate. Taucht trotzdem
+ein Clip mit abweichendem Format auf (z.B. nach Änderung von VIDEO_RESOLUTION
+oder VIDEO_FPS), wird er mit Warnung übersprungen statt den ganzen Tag neu zu
+kodieren - verschiedene Zeitbasen ergeben bei Stream-Copy falsche Zeitstempel.
+Zu jedem Digest wird ein Kapitel-Index (JSON) mit dem Offset jedes Events
+geschrieben. Optional entsteht ein Zeitraffer mit niedriger Bildrate.
+Alle ffmpeg-Aufrufe laufen mit nice/ionice, damit die Live-Aufnahme Vorrang hat.
+
+Aufruf als Skript:
+    python3 digest.py 2025-06-01 [--timelapse]
+"""
+import argparse
+import json
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+DB_PATH = BASE_DIR / "smart_doorbell.db"
+VIDEO_DIR = BASE_DIR / "static" / "videos"
+DIGEST_DIR = BASE_DIR / "static" / "digests"
+
+TIMELAPSE_SPEED = 8   # Zeitraffer-Faktor
+TIMELAPSE_FPS = 4     # Bildrate des Zeitraffers
+PROBE_TIMEOUT = 10        # Sekunden pro ffprobe
+CONCAT_TIMEOUT = 600      # Sekunden für das Aneinanderhängen
+TIMELAPSE_TIMEOUT = 1800  # Sekunden für den Zeitraffer
+
+
+def _low_priority(cmd):
+    """Stellt nice/ionice voran, soweit auf dem System vorhanden"""
+    prefix = []
+    if shutil.which("ionice"):
+        prefix += ["ionice", "-c", "3"]  # Idle-Klasse: nur wenn sonst niemand liest/schreibt
+    if shutil.which("nice"):
+        prefix += ["nice", "-n", "19"]
+    return prefix + cmd
+
+
+def probe_clip(path):
+    """(Dauer in Sekunden, (Breite, Höhe, Bildrate)) eines Clips oder (None, None)"""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=width,height,r_frame_rate:format=duration",
+             "-of", "json", str(path)],
+            capture_output=True, text=True, timeout=PROBE_TIMEOUT
+        )
+        if result.returncode != 0:
+            return None, None
+        info = json.loads(result.stdout)
+        stream = info["streams"][0]
+        clip_format = (int(stream["width"]), int(stream["height"]), stream["r_frame_rate"])
+        return float(info["format"]["duration"]), clip_format
+    except (ValueError, KeyError, IndexError, subprocess.TimeoutExpired, FileNotFoundError):
+        return None, None
+
+
+def get_day_clips(day, db_path=DB_PATH, video_dir=VIDEO_DIR):
+    """Events eines Tages (YYYY-MM-DD) mit vorhandener Videodatei, chronologisch"""
+    next_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute("""
+            SELECT id, timestamp, event_type, video_file
+            FROM events
+            WHERE timestamp >= ? AND timestamp < ? AND video_file IS NOT NULL
+            ORDER BY timestamp
+        """, (f"{day} 00:00:00", f"{next_day} 00:00:00")).fetchall()
+    finally:
+        conn.close()
+
+    clips = []
+    for row in rows:
+        filename = row["video_file"]
+        if not filename.endswith(".mp4"):
+            filename += ".mp4"
+        path = video_dir / filename
+        if path.exists():
+            clips.append((dict(row), path))
+    return clips
+
+
+def digest_paths(day, digest_dir=DIGEST_DIR):
+    return {
+        "video": digest_dir / f"digest_{day}.mp4",
+        "timelapse": digest_dir / f"timelapse_{day}.mp4",
+        "index": digest_dir / f"digest_{day}.json",
+    }
+
+
+def build_digest(day, timelapse=False, db_path=DB_PATH, video_dir=VIDEO_DIR, digest_dir=DIGEST_DIR,
+                 progress=None):
+    """Erstellt Digest-Video und Kapitel-Index für einen Tag.
+
+    progress(sekunden) wird vor jedem langen Schritt mit dessen maximaler
+    Dauer aufgerufen (Heartbeat für die Thread-Überwachung).
+    Gibt den Index (dict) zurück oder None, wenn es keine Clips gab.
+    """
+    progress = progress or (lambda expected: None)
+    clips = get_day_clips(day, db_path, video_dir)
+    if not clips:
+        print(f"[DIGEST] Keine Clips für {day}", flush=True)
+        return None
+
+    digest_dir.mkdir(parents=True, exist_ok=True)
+    paths = digest_paths(day, digest_dir)
+
+    probed = []
+    for event, path in clips:
+        progress(PROBE_TIMEOUT)
+        duration, clip_format = probe_clip(path)
+        if duration is None:
+            print(f"[DIGEST] Überspringe unlesbaren Clip {path.name}", flush=True)
+            continue
+        probed.append((event, path, duration, clip_format))
+    if not probed:
+        return None
+
+    # Stream-Copy geht nur bei gleicher Auflösung und Bildrate - das häufigste Format gewinnt
+    formats = Counter(clip_format for _, _, _, clip_format in probed)
+    main_format = formats.most_common(1)[0][0]
+    skipped = [path.name for _, path, _, clip_format in probed if clip_format != main_format]
+    if skipped:
+        width, height, rate = main_format
+        print(f"[DIGEST] Überspringe {len(skipped)} Clip(s) mit anderem Format als "
+              f"{width}x{height}@{rate}: {', '.join(skipped)}", flush=True)
+
+    chapters = []
+    offset = 0.0
+    for event, path, duration, clip_format in probed:
+        if clip_format != main_format:
+            continue
+        chapters.append({
+            "event_id": event["id"],
+            "event_type": event["event_type"],
+            "timestamp": event["timestamp"],
+            "offset": round(offset, 2),
+            "duration": round(duration, 2),
+            "file": path.name,
+        })
+        offset += duration
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", dir=digest_dir, delete=False) as f:
+        for chapter in chapters:
+            escaped = str(video_dir / chapter["file"]).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+        list_path = Path(f.name)
+
+    tmp_video = paths["video"].with_suffix(".part.mp4")
+    progress(CONCAT_TIMEOUT)
+    try:
+        result = subprocess.run(_low_priority([
+            "ffmpeg", "-v", "error",
+            "-f", "concat", "-safe", "0",
+            "-i", str(list_path),
+            "-c", "copy",                 # Kein Re-Encoding
+            "-movflags", "+faststart",
+            "-y", str(tmp_video)
+        ]), capture_output=True, text=True, timeout=CONCAT_TIMEOUT)
+        if result.returncode != 0:
+            print(f"[DIGEST] ffmpeg Fehler: {result.stderr}", flush=True)
+            tmp_video.unlink(missing_ok=True)
+            return None
+        tmp_video.replace(paths["video"])
+    finally:
+        list_path.unlink(missing_ok=True)
+
+    index = {
+        "day": day,
+        "video": paths["video"].name,
+        "timelapse": None,
+        "duration": round(offset, 2),
+        "chapters": chapters,
+        "skipped": skipped,
+    }
+
+    if timelapse:
+        progress(TIMELAPSE_TIMEOUT)
+        if build_timelapse(paths["video"], paths["timelapse"]):
+            index["timelapse"] = paths["timelapse"].name
+
+    paths["index"].write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[DIGEST] {day}: {len(chapters)} Clips, {offset:.0f}s -> {paths['video'].name}", flush=True)
+    return index
+
+
+def build_timelapse(source, target):
+    """Zeitraffer mit niedriger Bildrate (Re-Encoding, aber mit kleiner Auflösung)"""
+    tmp = target.with_suffix(".part.mp4")
+    result = subprocess.run(_low_priority([
+        "ffmpeg", "-v", "error",
+        "-i", str(source),
+        "-vf", f"setpts=PTS/{TIMELAPSE_SPEED},fps={TIMELAPSE_FPS},scale=320:-2",
+        "-an",
+        "-c:v", "libx264", "-preset", "veryfast", "-threads", "1",
+        "-movflags", "+faststart",
+        "-y", str(tmp)
+    ]), capture_output=True, text=True, timeout=TIMELAPSE_TIMEOUT)
+    if result.returncode != 0:
+        print(f"[DIGEST] Zeitraffer fehlgeschlagen: {result.stderr}", flush=True)
+        tmp.unlink(missing_ok=True)
+        return False
+    tmp.replace(target)
+    return True
+
+
+def load_index(day, digest_dir=DIGEST_DIR):
+    path = digest_paths(day, digest_dir)["index"]
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def list_digests(digest_dir=DIGEST_DIR):
+    """Alle vorhandenen Digest-Tage, neueste zuerst"""
+    if not digest_dir.exists():
+        return []
+    return sorted((p.stem[len("digest_"):] for p in digest_dir.glob("digest_*.json")), reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tages-Digest erstellen")
+    parser.add_argument("day", help="Tag im Format YYYY-MM-DD")
+    parser.add_argument("--timelapse", action="store_true", help="Zusätzlich Zeitraffer erstellen")
+    args = parser.parse_args()
+    build_digest(args.day, timelapse=args.timelapse)
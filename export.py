@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Streaming-Export der Event-Historie als CSV, NDJSON, Parquet oder Arrow.
+
+Liest aus einem konsistenten Snapshot (eine Lese-Transaktion, WAL-Modus),
+damit der Export die Inserts des Recorders nicht blockiert. Monats-Archive
+werden vorher einzeln nacheinander gelesen (älteste zuerst) - so gibt es keine
+Grenze für die Anzahl Archive. Speicherbedarf ist konstant: es werden nur
+BATCH_ROWS Zeilen gleichzeitig gehalten.
+
+Beispiele:
+    python3 export.py --format csv > events.csv
+    python3 export.py --format parquet --since 2025-01-01 --type ring -o rings.parquet
+"""
+import argparse
+import csv
+import io
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import db_maintenance
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional - ohne pyarrow nur CSV/NDJSON
+    pa = None
+    pq = None
+
+BASE_DIR = Path(__file__).resolve().parent
+DB_PATH = BASE_DIR / "smart_doorbell.db"
+
+COLUMNS = ["id", "timestamp", "event_type", "video_file", "temperature", "motion_score"]
+BATCH_ROWS = 5000
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+
+def _build_query(since=None, until=None, event_types=None, before=None):
+    sql = f"SELECT {', '.join(COLUMNS)} FROM events"
+    where, params = [], []
+    if before:
+        where.append("timestamp < ?")
+        params.append(before)
+    if since:
+        where.append("timestamp >= ?")
+        params.append(since)
+    if until:
+        where.append("timestamp < ?")
+        params.append(until)
+    if event_types:
+        where.append(f"event_type IN ({', '.join('?' * len(event_types))})")
+        params.extend(event_types)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY timestamp, id"
+    return sql, params
+
+
+def iter_batches(db_path=DB_PATH, since=None, until=None, event_types=None,
+                 archive_dir=db_maintenance.ARCHIVE_DIR):
+    """Liefert Listen von Zeilen-Tupeln aus einem Snapshot der Datenbank (inkl. Archive)"""
+    conn = sqlite3.connect(db_path)
+    conn.isolation_level = None
+    try:
+        # Lese-Transaktion = konsistenter Snapshot; im WAL-Modus schreibt der Recorder weiter
+        conn.execute("BEGIN")
+        # Die erste Abfrage legt den Snapshot fest. Läuft parallel eine Archivierung,
+        # stehen Zeilen kurz in beiden DBs - aus den Archiven nur, was älter ist
+        boundary = conn.execute("SELECT MIN(timestamp) FROM events").fetchone()[0]
+        for month in db_maintenance.archive_months(archive_dir, since, until):
+            arch = sqlite3.connect(db_maintenance.archive_path(month, archive_dir))
+            try:
+                yield from _fetch_batches(arch, *_build_query(since, until, event_types, before=boundary))
+            finally:
+                arch.close()
+        yield from _fetch_batches(conn, *_build_query(since, until, event_types))
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def _fetch_batches(conn, sql, params):
+    cur = conn.execute(sql, params)
+    while True:
+        rows = cur.fetchmany(BATCH_ROWS)
+        if not rows:
+            break
+        yield rows
+
+
+def stream_csv(batches):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def stream_ndjson(batches):
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows
+        ).encode("utf-8")
+
+
+def _arrow_schema():
+    return pa.schema([
+        ("id", pa.int64()),
+        ("timestamp", pa.string()),
+        ("event_type", pa.string()),
+        ("video_file", pa.string()),
+        ("temperature", pa.float64()),
+        ("motion_score", pa.float64()),
+    ])
+
+
+def _record_batch(rows, schema):
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Schreib-Puffer, der geleert werden kann ohne die Dateiposition zu verlieren.
+
+    Parquet speichert absolute Offsets im Footer - ein zurückgesetztes BytesIO
+    würde diese verfälschen.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(batches):
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))  # Eine Row-Group pro Batch
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_arrow(batches):
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+    "arrow": stream_arrow,
+}
+
+
+def export_events(fmt, db_path=DB_PATH, since=None, until=None, event_types=None):
+    """Generator mit den Bytes des Exports im gewünschten Format.
+
+    Wirft ValueError bei unbekanntem Format oder fehlendem pyarrow.
+    """
+    if fmt not in STREAMERS:
+        raise ValueError(f"Unbekanntes Format: {fmt} (erlaubt: {', '.join(FORMATS)})")
+    if fmt in ("parquet", "arrow") and pa is None:
+        raise ValueError(f"Format {fmt} benötigt pyarrow: pip install pyarrow")
+    return STREAMERS[fmt](iter_batches(db_path, since, until, event_types))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-Historie exportieren")
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--since", help="Ab Zeitpunkt (inklusive), z.B. 2025-01-01")
+    parser.add_argument("--until", help="Bis Zeitpunkt (exklusive), z.B. 2026-01-01")
+    parser.add_argument("--type", action="append", dest="types", help="Event-Typ (mehrfach möglich)")
+    parser.add_argument("--db", default=str(DB_PATH))
+    parser.add_argument("-o", "--output", help="Ausgabedatei (Standard: stdout)")
+    args = parser.parse_args()
+
+    try:
+        chunks = export_events(args.format, args.db, args.since, args.until, args.types)
+        out = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
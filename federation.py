@@ -0,0 +1,280 @@
+"""Föderation mehrerer Türklingeln: Events anderer Knoten einsammeln.
+
+Jeder Knoten bietet /api/events/since?after_id=N an. Ein Knoten mit
+registrierten Peers holt davon inkrementell nur neue Events (High-Water-Mark
+pro Peer) und speichert sie in remote_events. Alle Peers werden parallel
+abgefragt, Vorschaubilder werden lokal gecacht (fehlende werden bei späteren
+Syncs erneut versucht). Die gemeinsame Timeline ist
+ein UNION ALL über lokale und entfernte Events mit Herkunft (origin).
+"""
+import json
+import sqlite3
+import subprocess
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SYNC_BATCH = 500         # Events pro Abruf
+FETCH_TIMEOUT = 5        # Sekunden pro HTTP-Anfrage
+MAX_WORKERS = 8          # Parallele Abrufe (Peers und Vorschaubilder)
+THUMB_WIDTH = 160
+THUMB_RETRY_BATCH = 50   # Fehlende Vorschaubilder pro Sync
+THUMB_MAX_ATTEMPTS = 5   # Danach gilt ein Vorschaubild als nicht verfügbar
+
+
+def make_thumbnail(video_path, thumb_path):
+    """Erzeugt ein kleines JPEG-Vorschaubild aus einem Clip (falls noch nicht vorhanden)"""
+    if thumb_path.exists():
+        return True
+    thumb_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = thumb_path.with_suffix(".part.jpg")
+    try:
+        result = subprocess.run([
+            'ffmpeg', '-v', 'error',
+            '-ss', '1', '-i', str(video_path),
+            '-frames:v', '1',
+            '-vf', f'scale={THUMB_WIDTH}:-2',
+            '-y', str(tmp)
+        ], capture_output=True, timeout=15)
+        if result.returncode != 0 or not tmp.exists():
+            tmp.unlink(missing_ok=True)
+            return False
+        tmp.replace(thumb_path)
+        return True
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        tmp.unlink(missing_ok=True)
+        return False
+
+
+class Federation:
+    """Verwaltet Peers, synchronisiert deren Events und liefert die gemeinsame Timeline"""
+
+    def __init__(self, db_path, thumb_dir, on_change=None):
+        self.db_path = db_path
+        self.thumb_dir = thumb_dir
+        self.on_change = on_change  # z.B. Cache-Invalidierung nach neuen Remote-Events
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="federation")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS peers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    url TEXT NOT NULL UNIQUE,
+                    high_water INTEGER NOT NULL DEFAULT 0,
+                    last_sync REAL,
+                    last_error TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS remote_events (
+                    peer_id INTEGER NOT NULL REFERENCES peers(id) ON DELETE CASCADE,
+                    remote_id INTEGER NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    video_file TEXT,
+                    temperature REAL,
+                    motion_score REAL,
+                    PRIMARY KEY (peer_id, remote_id)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_remote_events_timestamp ON remote_events(timestamp)")
+            # Migration: Status der Vorschaubilder
+            for column in ("has_thumb INTEGER NOT NULL DEFAULT 0",
+                           "thumb_attempts INTEGER NOT NULL DEFAULT 0"):
+                try:
+                    conn.execute(f"ALTER TABLE remote_events ADD COLUMN {column}")
+                except sqlite3.OperationalError:
+                    pass  # Spalte existiert bereits
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ----- Peers -----
+
+    def add_peer(self, name, url):
+        url = url.rstrip("/")
+        parsed = urllib.parse.urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.netloc:
+            raise ValueError(f"Ungültige Peer-URL: {url}")
+        conn = self._connect()
+        try:
+            conn.execute("""
+                INSERT INTO peers (name, url) VALUES (?, ?)
+                ON CONFLICT(url) DO UPDATE SET name = excluded.name
+            """, (name, url))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def remove_peer(self, peer_id):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM remote_events WHERE peer_id = ?", (peer_id,))
+            conn.execute("DELETE FROM peers WHERE id = ?", (peer_id,))
+            conn.commit()
+        finally:
+            conn.close()
+        if self.on_change:
+            self.on_change()
+
+    def get_peers(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT p.id, p.name, p.url, p.high_water, p.last_sync, p.last_error,
+                       (SELECT COUNT(*) FROM remote_events r WHERE r.peer_id = p.id) AS events
+                FROM peers p ORDER BY p.name
+            """).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    # ----- Synchronisation -----
+
+    def _fetch_json(self, url):
+        with urllib.request.urlopen(url, timeout=FETCH_TIMEOUT) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    def _fetch_peer(self, peer):
+        """Holt alle neuen Events eines Peers (läuft im Thread-Pool)"""
+        events = []
+        after_id = peer["high_water"]
+        while True:
+            query = urllib.parse.urlencode({"after_id": after_id, "limit": SYNC_BATCH})
+            batch = self._fetch_json(f"{peer['url']}/api/events/since?{query}")
+            events.extend(batch)
+            if len(batch) < SYNC_BATCH:
+                return events
+            after_id = batch[-1]["id"]
+
+    def _fetch_thumbnail(self, peer_id, peer_url, event_id):
+        """Lädt ein Vorschaubild eines Peers. Gibt True zurück, wenn es lokal vorliegt."""
+        path = self.thumb_dir / "peers" / str(peer_id) / f"{event_id}.jpg"
+        if path.exists():
+            return True
+        try:
+            with urllib.request.urlopen(f"{peer_url}/thumbnail/{event_id}.jpg",
+                                        timeout=FETCH_TIMEOUT) as resp:
+                data = resp.read()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".part")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+            return True
+        except Exception:
+            return False  # Vorschaubild ist optional - nächster Sync versucht es erneut
+
+    def _sync_thumbnails(self):
+        """Lädt fehlende Vorschaubilder parallel nach. Gibt die Anzahl neuer zurück."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT r.peer_id, r.remote_id, p.url
+                FROM remote_events r JOIN peers p ON p.id = r.peer_id
+                WHERE r.video_file IS NOT NULL AND r.has_thumb = 0 AND r.thumb_attempts < ?
+                ORDER BY r.timestamp DESC LIMIT ?
+            """, (THUMB_MAX_ATTEMPTS, THUMB_RETRY_BATCH)).fetchall()
+            futures = [(row, self._pool.submit(self._fetch_thumbnail, row["peer_id"], row["url"], row["remote_id"]))
+                       for row in rows]
+            fetched, failed = [], []
+            for row, future in futures:
+                (fetched if future.result() else failed).append((row["peer_id"], row["remote_id"]))
+            conn.executemany("UPDATE remote_events SET has_thumb = 1 WHERE peer_id = ? AND remote_id = ?", fetched)
+            conn.executemany("""
+                UPDATE remote_events SET thumb_attempts = thumb_attempts + 1
+                WHERE peer_id = ? AND remote_id = ?
+            """, failed)
+            conn.commit()
+        finally:
+            conn.close()
+        return len(fetched)
+
+    def sync_all(self):
+        """Synchronisiert alle Peers parallel. Gibt die Anzahl neuer Events zurück."""
+        if not self._lock.acquire(blocking=False):
+            return 0  # Sync läuft bereits
+        try:
+            peers = self.get_peers()
+            futures = {peer["id"]: (peer, self._pool.submit(self._fetch_peer, peer)) for peer in peers}
+
+            total = 0
+            conn = self._connect()
+            try:
+                for peer_id, (peer, future) in futures.items():
+                    try:
+                        events = future.result()
+                    except Exception as e:
+                        conn.execute("UPDATE peers SET last_error = ?, last_sync = ? WHERE id = ?",
+                                     (str(e)[:300], time.time(), peer_id))
+                        continue
+
+                    conn.executemany("""
+                        INSERT OR IGNORE INTO remote_events
+                            (peer_id, remote_id, timestamp, event_type, video_file, temperature, motion_score)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, [(peer_id, ev["id"], ev["timestamp"], ev["event_type"], ev.get("video_file"),
+                           ev.get("temperature"), ev.get("motion_score")) for ev in events])
+                    high_water = max([ev["id"] for ev in events], default=peer["high_water"])
+                    conn.execute("""
+                        UPDATE peers SET high_water = ?, last_sync = ?, last_error = NULL WHERE id = ?
+                    """, (high_water, time.time(), peer_id))
+                    total += len(events)
+                conn.commit()
+            finally:
+                conn.close()
+
+            # Timeline zuerst freigeben, Vorschaubilder danach nachladen
+            if total and self.on_change:
+                self.on_change()
+            if self._sync_thumbnails() and self.on_change:
+                self.on_change()  # Gecachtes Dashboard soll die neuen Bilder zeigen
+            return total
+        finally:
+            self._lock.release()
+
+    # ----- Timeline -----
+
+    def merged_events(self, limit=20):
+        """Lokale und entfernte Events gemischt, neueste zuerst, mit Herkunft"""
+        conn = self._connect()
+        try:
+            # Jede Quelle liefert über ihren Timestamp-Index nur die neuesten "limit" Zeilen
+            rows = conn.execute("""
+                SELECT * FROM (
+                    SELECT id, timestamp, event_type, video_file, temperature, motion_score,
+                           'local' AS origin, NULL AS origin_url, NULL AS peer_id
+                    FROM events
+                    ORDER BY timestamp DESC LIMIT :limit
+                )
+                UNION ALL
+                SELECT * FROM (
+                    SELECT r.remote_id, r.timestamp, r.event_type, r.video_file, r.temperature,
+                           r.motion_score, p.name, p.url, p.id
+                    FROM remote_events r JOIN peers p ON p.id = r.peer_id
+                    ORDER BY r.timestamp DESC LIMIT :limit
+                )
+                ORDER BY timestamp DESC
+                LIMIT :limit
+            """, {"limit": limit}).fetchall()
+        finally:
+            conn.close()
+
+        events = []
+        for row in rows:
+            event = dict(row)
+            if event["peer_id"] is not None:
+                thumb = self.thumb_dir / "peers" / str(event["peer_id"]) / f"{event['id']}.jpg"
+                event["thumbnail"] = f"thumbnails/peers/{event['peer_id']}/{event['id']}.jpg" if thumb.exists() else None
+            events.append(event)
+        return events
@@ -2,9 +2,11 @@
 from pitop.pma import LightSensor
 from time import sleep
 from datetime import datetime
+from sensor_conversion import RollingStats, SensorConverter
 
 # Lichtsensor an A0 initialisieren
 light_sensor = LightSensor("A0")
+converter = SensorConverter("A0")  # Rohwert (0-1023) -> Prozent, inkl. Kalibrier-Offset
 
 print("=" * 60)
 print("🌞 PI-TOP LICHTSENSOR TEST (A0)")
@@ -14,25 +16,18 @@ print("\n📊 Zeige Lichtwerte in Echtzeit")
 print("   Strg+C zum Beenden")
 print("-" * 60)
 
-# Für Statistik
-min_value = 100
-max_value = 0
-samples = []
+# Für Statistik (gleitend über die letzten 20 Werte, O(1) pro Messung)
+stats = RollingStats(size=20)
 
 try:
     while True:
-        # Sensorwert lesen (0-100)
-        value = light_sensor.reading
+        # Sensorwert lesen (ADC 0-1023) und in Prozent (0-100) umrechnen
+        value = converter.light(light_sensor.reading)
         timestamp = datetime.now().strftime("%H:%M:%S")
         
         # Statistik aktualisieren
-        min_value = min(min_value, value)
-        max_value = max(max_value, value)
-        
-        samples.append(value)
-        if len(samples) > 20:
-            samples.pop(0)
-        avg_value = sum(samples) / len(samples)
+        stats.add(value)
+        min_value, max_value, avg_value = stats.min, stats.max, stats.average
         
         # Lichtstatus bestimmen
         if value < 10:
@@ -67,8 +62,9 @@ except KeyboardInterrupt:
     print("\n" + "=" * 60)
     print("📊 TEST BEENDET - STATISTIK")
     print("=" * 60)
-    print(f"   Minimalwert:  {min_value:.0f}%")
-    print(f"   Maximalwert:  {max_value:.0f}%")
-    print(f"   Durchschnitt: {sum(samples)/len(samples):.0f}%")
-    print(f"   Messungen:    {len(samples)}")
+    if stats.count:
+        print(f"   Minimalwert:  {stats.min:.0f}%")
+        print(f"   Maximalwert:  {stats.max:.0f}%")
+        print(f"   Durchschnitt: {stats.average:.0f}%")
+    print(f"   Messungen:    {stats.count}")
     print("=" * 60)
\ No newline at end of file
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Benachrichtigungen über eine Outbox mit Batching und Retry.
+
+notify() legt nur einen Eintrag in eine In-Memory-Queue (O(1)) und blockiert
+den Aufnahme-Pfad nie. Ein Worker-Thread schreibt die Einträge in die Tabelle
+notification_outbox (überlebt Neustarts), sammelt Motion-Bursts zu Batches und
+liefert an alle Sinks aus (Webhook, MQTT, lokales Skript). Fehlgeschlagene
+Zustellungen werden mit exponentiellem Backoff wiederholt.
+
+Aufruf als Skript startet einen lokalen HTTP-Stub zum Testen:
+    python3 notifications.py --stub 8099
+    -> NOTIFY_WEBHOOK_URL = "http://127.0.0.1:8099/"
+"""
+import json
+import queue
+import sqlite3
+import subprocess
+import threading
+import time
+import urllib.request
+from collections import deque
+
+try:
+    import paho.mqtt.publish as mqtt_publish
+except ImportError:  # optional - ohne paho kein MQTT-Sink
+    mqtt_publish = None
+
+BATCH_WINDOW = 10.0    # Motion-Events innerhalb dieses Fensters werden zusammengefasst
+MAX_BATCH = 50         # Maximale Einträge pro Zustellung
+RETRY_BASE = 2.0       # Sekunden bis zum ersten Retry, danach verdoppelt
+RETRY_MAX = 600.0      # Obergrenze für den Backoff
+MAX_ATTEMPTS = 12      # Danach wird der Eintrag als "failed" markiert
+IMMEDIATE_TYPES = ("ring",)  # Diese Typen werden nicht gesammelt
+
+
+class WebhookSink:
+    """POST des Batches als JSON an eine URL"""
+
+    def __init__(self, url, timeout=5):
+        self.name = f"webhook:{url}"
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, batch):
+        data = json.dumps({"events": batch}).encode("utf-8")
+        req = urllib.request.Request(self.url, data=data, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            if resp.status >= 300:
+                raise RuntimeError(f"HTTP {resp.status}")
+
+
+class MqttSink:
+    """Veröffentlicht den Batch auf einem MQTT-Topic (benötigt paho-mqtt)"""
+
+    def __init__(self, host, topic="doorbell/events", port=1883):
+        if mqtt_publish is None:
+            raise RuntimeError("paho-mqtt nicht installiert: pip install paho-mqtt")
+        self.name = f"mqtt:{host}/{topic}"
+        self.host = host
+        self.port = port
+        self.topic = topic
+
+    def send(self, batch):
+        mqtt_publish.single(self.topic, json.dumps({"events": batch}), qos=1,
+                            hostname=self.host, port=self.port)
+
+
+class ScriptSink:
+    """Ruft ein lokales Skript auf, der Batch kommt als JSON über stdin"""
+
+    def __init__(self, path, timeout=10):
+        self.name = f"script:{path}"
+        self.path = path
+        self.timeout = timeout
+
+    def send(self, batch):
+        result = subprocess.run([self.path], input=json.dumps({"events": batch}),
+                                capture_output=True, text=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"Exit-Code {result.returncode}")
+
+
+class Notifier:
+    """Outbox-basierte Benachrichtigung mit eigenem Worker-Thread"""
+
+    def __init__(self, db_path, sinks=()):
+        self.db_path = db_path
+        self.sinks = {sink.name: sink for sink in sinks}
+        self.running = False
+        self._queue = queue.Queue()
+        self._thread = None
+        self._latencies = deque(maxlen=200)
+        self.sent = 0
+        self.failed = 0
+
+    def init_db(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS notification_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sink TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt REAL NOT NULL,
+                    delivered REAL,
+                    last_error TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_outbox_due
+                ON notification_outbox(status, sink, next_attempt)
+            """)
+            # Offene Einträge für Sinks, die seit dem letzten Start geändert oder
+            # entfernt wurden, kann niemand mehr zustellen
+            placeholders = ", ".join("?" * len(self.sinks))
+            cur = conn.execute(f"""
+                UPDATE notification_outbox SET status = 'orphaned'
+                WHERE status = 'pending' AND sink NOT IN ({placeholders})
+            """, tuple(self.sinks))
+            if cur.rowcount:
+                print(f"[NOTIFY] {cur.rowcount} offene Einträge für nicht mehr konfigurierte Sinks "
+                      f"als 'orphaned' markiert", flush=True)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def start(self):
+        if self.running or not self.sinks:
+            return
+        self.init_db()
+        self.running = True
+        self._thread = threading.Thread(target=self._worker, name="notifier", daemon=True)
+        self._thread.start()
+        print(f"[NOTIFY] Gestartet mit {len(self.sinks)} Sink(s): {', '.join(self.sinks)}", flush=True)
+
+    @property
+    def thread(self):
+        """Worker-Thread (für die Thread-Überwachung)"""
+        return self._thread
+
+    def stop(self):
+        self.running = False
+        self._queue.put(None)
+
+    def notify(self, event_type, **data):
+        """Nicht-blockierend: merkt ein Ereignis zur Zustellung vor"""
+        if not self.sinks:
+            return
+        payload = {"event_type": event_type, "time": time.time(), **data}
+        self._queue.put(payload)
+
+    # ----- Worker -----
+
+    def _worker(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            while self.running:
+                try:
+                    items = self._drain(timeout=self._next_due_in(conn))
+                    self._persist(conn, items)
+                    self._deliver_due(conn)
+                except Exception as e:
+                    print(f"[NOTIFY] Worker-Fehler: {e}", flush=True)
+                    time.sleep(1)
+        finally:
+            conn.close()
+
+    def _drain(self, timeout):
+        """Wartet auf das erste Ereignis (max. timeout) und holt alle weiteren"""
+        items = []
+        try:
+            items.append(self._queue.get(timeout=timeout))
+            while True:
+                items.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return [item for item in items if item is not None]  # None = Stop-Signal
+
+    def _persist(self, conn, items):
+        if not items:
+            return
+        rows = []
+        for payload in items:
+            if payload["event_type"] in IMMEDIATE_TYPES:
+                due = payload["time"]
+            else:
+                # An die nächste Fenstergrenze runden -> ein Burst landet im selben Batch
+                due = (payload["time"] // BATCH_WINDOW + 1) * BATCH_WINDOW
+            for sink in self.sinks:
+                rows.append((sink, payload["event_type"], json.dumps(payload), payload["time"], due))
+        conn.executemany("""
+            INSERT INTO notification_outbox (sink, event_type, payload, created, next_attempt)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+
+    def _next_due_in(self, conn):
+        placeholders = ", ".join("?" * len(self.sinks))
+        row = conn.execute(f"""
+            SELECT MIN(next_attempt) FROM notification_outbox
+            WHERE status = 'pending' AND sink IN ({placeholders})
+        """, tuple(self.sinks)).fetchone()
+        if row[0] is None:
+            return 30.0
+        return min(30.0, max(0.05, row[0] - time.time()))
+
+    def _deliver_due(self, conn):
+        now = time.time()
+        for name, sink in self.sinks.items():
+            rows = conn.execute("""
+                SELECT id, payload, attempts FROM notification_outbox
+                WHERE status = 'pending' AND sink = ? AND next_attempt <= ?
+                ORDER BY id LIMIT ?
+            """, (name, now, MAX_BATCH)).fetchall()
+            if not rows:
+                continue
+
+            ids = [row[0] for row in rows]
+            batch = [json.loads(row[1]) for row in rows]
+            placeholders = ", ".join("?" * len(ids))
+            try:
+                sink.send(batch)
+            except Exception as e:
+                attempts = max(row[2] for row in rows) + 1
+                status = "failed" if attempts >= MAX_ATTEMPTS else "pending"
+                delay = min(RETRY_MAX, RETRY_BASE * 2 ** (attempts - 1))
+                conn.execute(f"""
+                    UPDATE notification_outbox
+                    SET attempts = ?, next_attempt = ?, last_error = ?, status = ?
+                    WHERE id IN ({placeholders})
+                """, (attempts, now + delay, str(e)[:500], status, *ids))
+                conn.commit()
+                if status == "failed":
+                    self.failed += len(ids)
+                print(f"[NOTIFY] {name} fehlgeschlagen (Versuch {attempts}): {e}", flush=True)
+                continue
+
+            delivered = time.time()
+            conn.execute(f"""
+                UPDATE notification_outbox SET status = 'sent', delivered = ?
+                WHERE id IN ({placeholders})
+            """, (delivered, *ids))
+            conn.commit()
+            self.sent += len(ids)
+            for payload in batch:
+                self._latencies.append(delivered - payload["time"])
+
+    def stats(self):
+        latencies = sorted(self._latencies)
+        pending = None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM notification_outbox WHERE status = 'pending'"
+                ).fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+        return {
+            "running": self.running,
+            "sinks": list(self.sinks),
+            "queued": self._queue.qsize(),
+            "pending": pending,
+            "sent": self.sent,
+            "failed": self.failed,
+            "latency_p50": round(latencies[len(latencies) // 2], 3) if latencies else None,
+            "latency_p95": round(latencies[int(len(latencies) * 0.95)], 3) if latencies else None,
+        }
+
+
+def run_stub(port):
+    """Lokaler HTTP-Empfänger zum Testen des Webhook-Sinks"""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            now = time.time()
+            for event in body["events"]:
+                print(f"[STUB] {event['event_type']:<8} Latenz {(now - event['time']) * 1000:.0f} ms")
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"[STUB] Webhook-Stub auf http://127.0.0.1:{port}/")
+    HTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benachrichtigungs-Werkzeuge")
+    parser.add_argument("--stub", type=int, metavar="PORT", help="Webhook-Stub starten")
+    args = parser.parse_args()
+    if args.stub:
+        run_stub(args.stub)
+    else:
+        parser.print_help()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Abgleich zwischen VIDEO_DIR und events.video_file nach einem Absturz.
+
+Aufnahmen werden als *.part.mp4 geschrieben und erst nach sauberem Ende
+umbenannt. Der Abgleich beim Start findet:
+- übrig gebliebene *.part.mp4 (abgebrochene Aufnahmen) -> Quarantäne
+- fertige Clips ohne Event -> Event wird aus dem Dateinamen wiederhergestellt,
+  unlesbare Clips -> Quarantäne
+- Events, deren Clip fehlt -> video_file wird auf NULL gesetzt. Ist VIDEO_DIR
+  leer oder fehlt ein großer Teil der Clips (Laufwerk nicht gemountet?), wird
+  nichts geändert und nur gewarnt
+
+Damit der Start auch mit zehntausenden Clips schnell bleibt, liegt ein
+Datei-Index (Name, Größe, mtime) in der Tabelle video_index. Nur neue oder
+geänderte Dateien werden mit ffprobe geprüft.
+
+Aufruf als Skript führt den Abgleich einmal aus:
+    python3 reconcile.py [--dry-run]
+"""
+import os
+import re
+import sqlite3
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+import db_maintenance
+
+BASE_DIR = Path(__file__).resolve().parent
+DB_PATH = BASE_DIR / "smart_doorbell.db"
+VIDEO_DIR = BASE_DIR / "static" / "videos"
+QUARANTINE_DIR = BASE_DIR / "quarantine"
+
+PART_SUFFIX = ".part.mp4"
+PART_GRACE = 120   # Sekunden - jüngere .part-Dateien können noch aktiv geschrieben werden
+DANGLING_MAX_FRACTION = 0.2   # Fehlen mehr Clips als dieser Anteil, wird nichts gelöscht
+DANGLING_MIN_COUNT = 5        # ... es sei denn, es sind höchstens so viele
+FILENAME_PATTERN = re.compile(r"^(?P<type>.+)_(?P<date>\d{8})_?(?P<time>\d{6})\.mp4$")
+
+
+def part_path(video_path):
+    """Temporärer Name während der Aufnahme (wird erst am Ende umbenannt)"""
+    return video_path.with_name(video_path.stem + PART_SUFFIX)
+
+
+def finalize(tmp_path, video_path):
+    """Atomares Umbenennen der fertigen Aufnahme (gleiches Dateisystem)"""
+    os.replace(tmp_path, video_path)
+
+
+def is_valid_clip(path):
+    """Prüft per ffprobe, ob ein Clip lesbar ist und eine Dauer hat"""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", str(path)],
+            capture_output=True, text=True, timeout=10
+        )
+        return result.returncode == 0 and float(result.stdout.strip() or 0) > 0
+    except (ValueError, subprocess.TimeoutExpired, FileNotFoundError):
+        return False
+
+
+def parse_filename(filename):
+    """(event_type, timestamp) aus einem Clip-Namen wie ring_20250601143000.mp4"""
+    match = FILENAME_PATTERN.match(filename)
+    if not match:
+        return None
+    try:
+        stamp = datetime.strptime(match["date"] + match["time"], "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+    return match["type"], stamp.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Reconciler:
+    """Gleicht Videodateien und Events ab und pflegt den Datei-Index"""
+
+    def __init__(self, db_path=DB_PATH, video_dir=VIDEO_DIR, quarantine_dir=QUARANTINE_DIR,
+                 archive_dir=db_maintenance.ARCHIVE_DIR, on_change=None):
+        self.db_path = db_path
+        self.video_dir = video_dir
+        self.quarantine_dir = quarantine_dir
+        self.archive_dir = archive_dir
+        self.on_change = on_change
+        self.last_result = None
+
+    def init_db(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_index (
+                    filename TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    valid INTEGER NOT NULL
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _referenced_files(self, conn):
+        """Alle Clip-Namen, auf die ein Event zeigt (Haupt-DB und Archive)"""
+        def normalize(name):
+            return name if name.endswith(".mp4") else name + ".mp4"
+
+        referenced = {normalize(row[0]) for row in
+                      conn.execute("SELECT video_file FROM events WHERE video_file IS NOT NULL")}
+        for month in db_maintenance.list_archives(self.archive_dir):
+            arch = sqlite3.connect(db_maintenance.archive_path(month, self.archive_dir))
+            try:
+                referenced |= {normalize(row[0]) for row in
+                               arch.execute("SELECT video_file FROM events WHERE video_file IS NOT NULL")}
+            finally:
+                arch.close()
+        return referenced
+
+    def _quarantine(self, path, dry_run):
+        if dry_run:
+            return
+        self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(path, self.quarantine_dir / path.name)
+
+    def run(self, dry_run=False):
+        """Führt den Abgleich aus und gibt eine Zusammenfassung zurück"""
+        start = time.perf_counter()
+        result = {"files": 0, "probed": 0, "parts_quarantined": 0, "events_restored": 0,
+                  "orphans_quarantined": 0, "dangling_cleared": 0, "dangling_skipped": 0}
+        now = time.time()
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            index = {row[0]: (row[1], row[2], row[3]) for row in
+                     conn.execute("SELECT filename, size, mtime, valid FROM video_index")}
+            referenced = self._referenced_files(conn)
+
+            on_disk = {}
+            with os.scandir(self.video_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.endswith(".mp4"):
+                        continue
+                    st = entry.stat()
+                    if entry.name.endswith(PART_SUFFIX):
+                        # Abgebrochene Aufnahme - nur wenn sicher nicht mehr geschrieben wird
+                        if now - st.st_mtime > PART_GRACE:
+                            self._quarantine(Path(entry.path), dry_run)
+                            result["parts_quarantined"] += 1
+                        continue
+                    on_disk[entry.name] = (st.st_size, st.st_mtime)
+            result["files"] = len(on_disk)
+
+            # Index aktualisieren: nur neue/geänderte Dateien kosten einen ffprobe
+            updates = []
+            for name, (size, mtime) in on_disk.items():
+                cached = index.get(name)
+                if cached and cached[0] == size and cached[1] == mtime:
+                    continue
+                valid = name in referenced or is_valid_clip(self.video_dir / name)
+                if name not in referenced:
+                    result["probed"] += 1
+                updates.append((name, size, mtime, int(valid)))
+                index[name] = (size, mtime, int(valid))
+            removed = [name for name in index if name not in on_disk]
+
+            # Clips ohne Event: wiederherstellen oder in Quarantäne
+            restored = []
+            for name in on_disk.keys() - referenced:
+                if now - on_disk[name][1] < PART_GRACE:
+                    continue  # Gerade fertig geworden - Event wird evtl. noch eingetragen
+                parsed = parse_filename(name)
+                if index[name][2] and parsed:
+                    restored.append((parsed[1], parsed[0], name))
+                else:
+                    self._quarantine(self.video_dir / name, dry_run)
+                    removed.append(name)
+                    result["orphans_quarantined"] += 1
+            result["events_restored"] = len(restored)
+
+            # Events ohne Clip (nur Haupt-DB; Archive bleiben unverändert)
+            dangling = []
+            references = 0
+            for event_id, video_file in conn.execute("SELECT id, video_file FROM events WHERE video_file IS NOT NULL"):
+                references += 1
+                name = video_file if video_file.endswith(".mp4") else video_file + ".mp4"
+                # Erneut prüfen: Clip kann nach dem Scan fertig geworden sein
+                if name not in on_disk and not (self.video_dir / name).exists():
+                    dangling.append(event_id)
+            # Sicherheitsnetz: leeres oder nicht gemountetes Video-Laufwerk darf nicht
+            # alle Clip-Verweise auf einmal löschen
+            if dangling and (not on_disk or len(dangling) > max(DANGLING_MIN_COUNT,
+                                                                 references * DANGLING_MAX_FRACTION)):
+                print(f"[ABGLEICH] ⚠️ {len(dangling)} von {references} Clips fehlen in {self.video_dir} - "
+                      f"Verweise bleiben erhalten (Laufwerk prüfen)", flush=True)
+                result["dangling_skipped"] = len(dangling)
+                dangling = []
+            result["dangling_cleared"] = len(dangling)
+
+            if not dry_run:
+                conn.executemany("INSERT OR REPLACE INTO video_index VALUES (?, ?, ?, ?)", updates)
+                conn.executemany("DELETE FROM video_index WHERE filename = ?", [(n,) for n in removed])
+                conn.executemany("""
+                    INSERT INTO events (timestamp, event_type, video_file) VALUES (?, ?, ?)
+                """, restored)
+                conn.executemany("UPDATE events SET video_file = NULL WHERE id = ?", [(i,) for i in dangling])
+                conn.commit()
+        finally:
+            conn.close()
+
+        result["elapsed"] = round(time.perf_counter() - start, 3)
+        self.last_result = result
+        if not dry_run and (restored or dangling) and self.on_change:
+            self.on_change()
+        print(f"[ABGLEICH] {result}", flush=True)
+        return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Videos und Events abgleichen")
+    parser.add_argument("--dry-run", action="store_true", help="Nur anzeigen, nichts ändern")
+    args = parser.parse_args()
+    reconciler = Reconciler()
+    reconciler.init_db()
+    reconciler.run(dry_run=args.dry_run)
@@ -0,0 +1,123 @@
+import hashlib
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Begrenzter LRU-Cache für gerenderte Seiten und JSON-Antworten.
+
+    Jeder Eintrag ist an die aktuelle Daten-Version gebunden. Die Version wird
+    bei jedem Einfügen/Löschen eines Events erhöht (bump), damit sind alle
+    älteren Einträge automatisch ungültig, ohne dass sie einzeln gelöscht
+    werden müssen.
+
+    Schreibt ein anderer Prozess in die Datenbank, erfährt bump() davon nichts.
+    Dafür fragt version höchstens alle state_interval Sekunden state() ab (z.B.
+    SqliteDataVersion) und erhöht die Version, wenn sich der Wert geändert hat.
+    Ein zufälliges Token pro Start fließt in jeden ETag ein, weil der Zähler
+    nach einem Neustart wieder bei 0 beginnt.
+    """
+
+    def __init__(self, max_entries=128, state=None, state_interval=1.0):
+        self.max_entries = max_entries
+        self.state = state
+        self.state_interval = state_interval
+        self._entries = OrderedDict()
+        self._version = 0
+        self._run_token = secrets.token_hex(8)
+        self._last_state = None
+        self._state_checked = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self):
+        self._check_state()
+        with self._lock:
+            return self._version
+
+    def _check_state(self):
+        """Übernimmt Änderungen anderer Prozesse (höchstens alle state_interval Sekunden)"""
+        if self.state is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._state_checked < self.state_interval:
+                return
+            self._state_checked = now
+        try:
+            current = self.state()
+        except Exception as e:
+            print(f"[CACHE] Datenstand nicht lesbar: {e}")
+            return
+        with self._lock:
+            if self._last_state is not None and current != self._last_state:
+                self._version += 1
+                self._entries.clear()
+            self._last_state = current
+
+    def bump(self):
+        """Erhöht die Daten-Version (nach INSERT/DELETE auf events)"""
+        with self._lock:
+            self._version += 1
+            # Einträge alter Versionen sind nie mehr erreichbar -> sofort freigeben
+            self._entries.clear()
+            return self._version
+
+    def etag_for(self, key, version):
+        """Starker ETag aus Start-Token, Schlüssel und Version - ohne Rendern berechenbar"""
+        raw = f"{self._run_token}:{version}:{key!r}".encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()[:20]
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get((version, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((version, key))
+            self.hits += 1
+            return entry
+
+    def put(self, key, version, body):
+        with self._lock:
+            if version != self._version:
+                return  # Während des Renderns veraltet - nicht speichern
+            self._entries[(version, key)] = body
+            self._entries.move_to_end((version, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class SqliteDataVersion:
+    """Liefert PRAGMA data_version einer SQLite-Datei als state() für ResponseCache.
+
+    Der Wert ändert sich auf dieser (dauerhaft offenen) Verbindung, sobald eine
+    andere Verbindung committet - auch aus einem anderen Prozess. Die Abfrage
+    liest keine Tabelle und kostet praktisch nichts.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
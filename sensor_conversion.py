@@ -0,0 +1,122 @@
+"""Umrechnung von 10-bit ADC-Werten über vorberechnete Tabellen.
+
+Für jeden der 1024 möglichen Rohwerte wird der Messwert einmal beim Start
+berechnet (Grove Temperature Sensor v1.2 mit NTC, Lichtsensor in Prozent),
+inklusive Kalibrier-Offset pro Gerät. Eine Messung kostet danach nur noch
+einen Tabellenzugriff, ganze Puffer werden mit NumPy in einem Schritt
+umgerechnet.
+
+Rohwert ist immer der 10-bit ADC-Code (0-1023) aus LightSensor.reading -
+Temperatur und Helligkeit werden ausschließlich hier umgerechnet.
+"""
+import math
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:  # ohne NumPy funktioniert alles, nur convert_batch ist langsamer
+    np = None
+
+ADC_MAX = 1023
+
+# Grove Temperature Sensor v1.2
+TEMP_B = 4275       # B-Wert des NTC Thermistors
+TEMP_R0 = 100000    # Widerstand bei 25°C (100K Ohm)
+
+# Kalibrier-Offsets pro Gerät (Port), z.B. {"A0": -0.8}
+TEMP_OFFSETS = {}
+LIGHT_OFFSETS = {}
+
+
+def _ntc_celsius(code, b=TEMP_B):
+    analog_value = code / float(ADC_MAX)
+    if analog_value <= 0 or analog_value >= 1:
+        return None
+    r = TEMP_R0 * (1.0 / analog_value - 1.0)
+    return 1.0 / (math.log(r / TEMP_R0) / b + 1.0 / 298.15) - 273.15
+
+
+def build_temperature_table(offset=0.0, b=TEMP_B):
+    """Temperatur in °C für jeden ADC-Wert (None an den Rändern 0 und 1023)"""
+    table = []
+    for code in range(ADC_MAX + 1):
+        celsius = _ntc_celsius(code, b)
+        table.append(None if celsius is None else celsius + offset)
+    return table
+
+
+def build_light_table(offset=0.0):
+    """Helligkeit in Prozent (0-100) für jeden ADC-Wert"""
+    return [min(100.0, max(0.0, code * 100.0 / ADC_MAX + offset)) for code in range(ADC_MAX + 1)]
+
+
+class SensorConverter:
+    """Tabellen für ein Gerät inklusive Kalibrierung"""
+
+    def __init__(self, device, temp_offset=None, light_offset=None):
+        self.device = device
+        self.temp_offset = TEMP_OFFSETS.get(device, 0.0) if temp_offset is None else temp_offset
+        self.light_offset = LIGHT_OFFSETS.get(device, 0.0) if light_offset is None else light_offset
+        self.temp_table = build_temperature_table(self.temp_offset)
+        self.light_table = build_light_table(self.light_offset)
+        if np is not None:
+            # NaN statt None, damit Batches als float-Array bleiben
+            self._temp_array = np.array([np.nan if t is None else t for t in self.temp_table])
+            self._light_array = np.array(self.light_table)
+
+    @staticmethod
+    def _code(raw):
+        return min(ADC_MAX, max(0, int(raw)))
+
+    def temperature(self, raw):
+        """°C für einen Rohwert (oder None, wenn außerhalb des Messbereichs)"""
+        return self.temp_table[self._code(raw)]
+
+    def light(self, raw):
+        """Helligkeit in Prozent für einen Rohwert"""
+        return self.light_table[self._code(raw)]
+
+    def convert_batch(self, raws, kind="temperature"):
+        """Rechnet einen ganzen Puffer Rohwerte um.
+
+        Mit NumPy: float-Array (NaN = ungültig). Ohne NumPy: Liste (None = ungültig).
+        """
+        if np is not None:
+            codes = np.clip(np.asarray(raws, dtype=np.int64), 0, ADC_MAX)
+            table = self._temp_array if kind == "temperature" else self._light_array
+            return table[codes]
+        table = self.temp_table if kind == "temperature" else self.light_table
+        return [table[self._code(raw)] for raw in raws]
+
+    def mean_batch(self, raws, kind="temperature"):
+        """(Mittelwert, Anzahl gültiger Werte) eines Puffers - (None, 0) ohne gültige Werte"""
+        values = self.convert_batch(raws, kind)
+        if np is not None:
+            valid = values[~np.isnan(values)]
+            return (float(valid.mean()), int(valid.size)) if valid.size else (None, 0)
+        valid = [v for v in values if v is not None]
+        return (sum(valid) / len(valid), len(valid)) if valid else (None, 0)
+
+
+class RollingStats:
+    """Gleitender Mittelwert über die letzten n Werte, Min/Max über alle Werte - O(1)"""
+
+    def __init__(self, size=20):
+        self.samples = deque(maxlen=size)
+        self.total = 0.0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if len(self.samples) == self.samples.maxlen:
+            self.total -= self.samples[0]
+        self.samples.append(value)
+        self.total += value
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def average(self):
+        return self.total / len(self.samples) if self.samples else None
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""Überwachung der Hintergrund-Threads mit Heartbeat, CPU-Zeit und Neustart.
+
+Jeder Worker wird registriert und ruft statt time.sleep() supervisor.sleep()
+auf. Das ist zugleich der Heartbeat: die Zeit vom Aufwachen bis zum nächsten
+sleep() ist die Schleifen-Latenz (reine Arbeitszeit pro Durchlauf) und landet
+in einem Histogramm. Ein Monitor-Thread prüft jede Sekunde:
+- abgestürzte Worker (Exception aus dem Thread) -> Neustart mit Backoff
+- hängende Worker (zu lange wach ohne Heartbeat) -> Ersatz-Thread mit neuer
+  Generation; der alte beendet sich beim nächsten active()/sleep()
+- CPU-Zeit pro Thread aus /proc/self/task/<tid>/stat (Fallback: time.thread_time()
+  vom Thread selbst gemeldet) und CPU-Anteil seit der letzten Messung
+
+Kurzlebige Threads (z.B. Videoaufnahmen) laufen über spawn() und werden nur
+gemessen, nicht neu gestartet. shutdown() weckt alle schlafenden Worker sofort
+und wartet höchstens timeout Sekunden auf alle Threads.
+"""
+import bisect
+import os
+import threading
+import time
+from collections import deque
+
+MONITOR_INTERVAL = 1.0      # Sekunden zwischen zwei Prüfungen
+RESTART_BACKOFF_BASE = 1.0  # Sekunden bis zum ersten Neustart, danach verdoppelt
+RESTART_BACKOFF_MAX = 60.0  # Obergrenze für den Backoff
+STABLE_AFTER = 60.0         # Läuft ein Worker so lange, wird der Backoff zurückgesetzt
+SPIN_CPU_PERCENT = 90.0     # Ab diesem CPU-Anteil gilt ein Thread als "dreht durch"
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, 30000)
+RECENT_TASKS = 20           # So viele beendete spawn()-Threads werden gemerkt
+
+try:
+    _CLK_TCK = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):  # kein /proc-System
+    _CLK_TCK = None
+
+
+def _proc_cpu_time(native_id):
+    """user+system CPU-Sekunden eines Threads laut /proc (oder None)"""
+    if _CLK_TCK is None or native_id is None:
+        return None
+    try:
+        with open(f"/proc/self/task/{native_id}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Der Thread-Name in Klammern darf Leerzeichen enthalten -> erst danach splitten
+    fields = stat[stat.rfind(")") + 2:].split()
+    return (int(fields[11]) + int(fields[12])) / _CLK_TCK
+
+
+class LatencyHistogram:
+    """Feste Buckets in Millisekunden - O(log n) pro Messung"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def to_dict(self):
+        labels = [f"<={b}" for b in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 2) if self.count else None,
+            "max_ms": round(self.max, 2),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class _Worker:
+    """Zustand eines überwachten Threads (Worker oder spawn()-Task)"""
+
+    def __init__(self, name, target, args=(), stall_timeout=None, oneshot=False, task=False):
+        self.name = name
+        self.target = target
+        self.args = args
+        self.stall_timeout = stall_timeout
+        self.oneshot = oneshot
+        self.task = task
+        self.thread = None
+        self.generation = 0
+        self.state = "new"
+        self.started = None
+        self.finished = None
+        self.last_wake = None
+        self.sleep_until = None
+        self.grace = 0.0        # Angekündigte Dauer eines langen Schritts (beat(expected))
+        self.beats = 0
+        self.restarts = 0
+        self.restarts_in_row = 0
+        self.failures = 0
+        self.stalls = 0
+        self.last_error = None
+        self.restart_at = None
+        self.cpu_reported = None
+        self.cpu_seconds = 0.0
+        self.cpu_base = 0.0     # CPU-Zeit früherer Generationen
+        self.cpu_percent = 0.0
+        self.latency = LatencyHistogram()
+
+    def status(self, now):
+        alive = self.thread is not None and self.thread.is_alive()
+        return {
+            "name": self.name,
+            "state": self.state,
+            "alive": alive,
+            "thread": self.thread.name if self.thread else None,
+            "native_id": self.thread.native_id if self.thread else None,
+            "generation": self.generation,
+            "uptime": round(now - self.started, 1) if self.started and alive else None,
+            "heartbeat_age": round(now - self.last_wake, 2) if self.last_wake and self.sleep_until is None else 0.0,
+            "beats": self.beats,
+            "restarts": self.restarts,
+            "failures": self.failures,
+            "stalls": self.stalls,
+            "last_error": self.last_error,
+            "cpu_seconds": round(self.cpu_base + self.cpu_seconds, 3),
+            "cpu_percent": round(self.cpu_percent, 1),
+            "spinning": self.cpu_percent >= SPIN_CPU_PERCENT,
+            "loop_latency": self.latency.to_dict(),
+        }
+
+
+class Supervisor:
+    """Registriert, überwacht und beendet die Hintergrund-Threads"""
+
+    def __init__(self, monitor_interval=MONITOR_INTERVAL):
+        self.monitor_interval = monitor_interval
+        self.workers = {}
+        self.tasks = {}
+        self.recent_tasks = deque(maxlen=RECENT_TASKS)
+        self.watched = {}
+        self.running = False
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._task_ids = 0
+        self._monitor = None
+        self._last_sample = None
+
+    # ----- Registrierung -----
+
+    def register(self, name, target, args=(), stall_timeout=None, oneshot=False):
+        """Meldet einen Worker an. oneshot=True: normales Ende ist kein Fehler.
+
+        stall_timeout: Sekunden ohne Heartbeat (außerhalb von sleep()), nach
+        denen der Worker als hängend gilt und ersetzt wird (None = nie).
+        """
+        worker = _Worker(name, target, args, stall_timeout, oneshot)
+        with self._lock:
+            self.workers[name] = worker
+        if self.running:
+            self._start(worker)
+        return worker
+
+    def watch(self, name, thread):
+        """Fremd verwaltete Threads (Kamera, Notifier) nur messen"""
+        if thread is not None:
+            worker = _Worker(name, None)
+            worker.thread = thread
+            worker.state = "running"
+            worker.started = time.time()
+            with self._lock:
+                self.watched[name] = worker
+
+    def spawn(self, name, target, args=(), timeout=None):
+        """Startet einen kurzlebigen Thread (kein Neustart, nur Messung)"""
+        with self._lock:
+            self._task_ids += 1
+            worker = _Worker(f"{name}#{self._task_ids}", target, args, timeout, oneshot=True, task=True)
+            self.tasks[worker.name] = worker
+        self._start(worker)
+        return worker.thread
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._stop.clear()
+        for worker in list(self.workers.values()):
+            self._start(worker)
+        self._monitor = threading.Thread(target=self._monitor_loop, name="supervisor", daemon=True)
+        self._monitor.start()
+        print(f"[SUPERVISOR] {len(self.workers)} Worker gestartet", flush=True)
+
+    def _start(self, worker):
+        worker.generation += 1
+        worker.cpu_base += worker.cpu_seconds
+        worker.cpu_seconds = 0.0
+        worker.cpu_reported = None
+        worker.state = "running"
+        worker.started = worker.last_wake = time.time()
+        worker.sleep_until = None
+        worker.grace = 0.0
+        worker.restart_at = None
+        worker.thread = threading.Thread(
+            target=self._run, args=(worker, worker.generation),
+            name=f"{worker.name}" if worker.task else f"{worker.name}-{worker.generation}",
+            daemon=True
+        )
+        worker.thread.start()
+
+    def _run(self, worker, generation):
+        self._local.worker = worker
+        self._local.generation = generation
+        try:
+            worker.target(*worker.args)
+            if worker.generation == generation:
+                if worker.oneshot:
+                    worker.state = "finished"
+                else:
+                    worker.state = "stopped" if self._stop.is_set() else "exited"
+        except Exception as e:
+            with self._lock:
+                worker.failures += 1
+                worker.last_error = f"{type(e).__name__}: {e}"
+                if worker.generation == generation:
+                    worker.state = "crashed"
+            print(f"[SUPERVISOR] {worker.name} abgestürzt: {worker.last_error}", flush=True)
+        finally:
+            if worker.generation == generation:
+                worker.finished = time.time()
+                worker.cpu_reported = time.thread_time()
+                if worker.task:
+                    with self._lock:
+                        self.tasks.pop(worker.name, None)
+                        self.recent_tasks.append(worker)
+
+    # ----- Aufrufe aus den Worker-Threads -----
+
+    def active(self):
+        """False, sobald beendet wird oder dieser Thread ersetzt wurde"""
+        if self._stop.is_set():
+            return False
+        worker = getattr(self._local, "worker", None)
+        return worker is None or worker.generation == self._local.generation
+
+    def sleep(self, seconds):
+        """Heartbeat + unterbrechbares Schlafen. Gibt active() zurück."""
+        worker = getattr(self._local, "worker", None)
+        current = worker is not None and worker.generation == self._local.generation
+        if current:
+            now = time.time()
+            with self._lock:
+                worker.latency.add((now - worker.last_wake) * 1000)
+                worker.beats += 1
+                worker.sleep_until = now + seconds
+                worker.cpu_reported = time.thread_time()
+        self._stop.wait(seconds)
+        if current:
+            worker.last_wake = time.time()
+            worker.sleep_until = None
+            worker.grace = 0.0
+        return self.active()
+
+    def beat(self, expected=0.0):
+        """Heartbeat ohne Schlafen, z.B. vor einem langen ffmpeg-Aufruf.
+
+        expected: so viele Sekunden darf der nächste Schritt zusätzlich zum
+        stall_timeout dauern, ohne als hängend zu gelten.
+        """
+        worker = getattr(self._local, "worker", None)
+        if worker is not None and worker.generation == self._local.generation:
+            with self._lock:
+                worker.beats += 1
+                worker.last_wake = time.time()
+                worker.grace = expected
+
+    # ----- Monitor -----
+
+    def _monitor_loop(self):
+        while not self._stop.wait(self.monitor_interval):
+            try:
+                self._check()
+            except Exception as e:
+                print(f"Fehler im Supervisor-Thread: {e}", flush=True)
+
+    def _check(self):
+        now = time.time()
+        with self._lock:
+            workers = list(self.workers.values())
+            tasks = list(self.tasks.values())
+        for worker in workers:
+            self._check_worker(worker, now)
+        for task in tasks:
+            # Aufnahmen können nicht abgebrochen werden - nur melden
+            if task.stall_timeout and task.state == "running" and now - task.started > task.stall_timeout:
+                task.state = "overdue"
+                task.stalls += 1
+                print(f"[SUPERVISOR] {task.name} läuft seit {now - task.started:.0f}s", flush=True)
+        self._sample_cpu(now)
+
+    def _check_worker(self, worker, now):
+        alive = worker.thread is not None and worker.thread.is_alive()
+        if worker.restart_at is not None:
+            if now >= worker.restart_at:
+                print(f"[SUPERVISOR] Starte {worker.name} neu (#{worker.restarts})", flush=True)
+                self._start(worker)
+            return
+
+        if not alive and worker.state in ("crashed", "exited"):
+            self._schedule_restart(worker, now)
+        elif alive and worker.stall_timeout and worker.sleep_until is None \
+                and now - worker.last_wake > worker.stall_timeout + worker.grace:
+            worker.stalls += 1
+            worker.last_error = f"kein Heartbeat seit {now - worker.last_wake:.0f}s"
+            print(f"[SUPERVISOR] {worker.name} hängt ({worker.last_error}) - ersetze Thread", flush=True)
+            worker.state = "stalled"
+            self._schedule_restart(worker, now)
+
+    def _schedule_restart(self, worker, now):
+        if worker.started and now - worker.started > STABLE_AFTER:
+            worker.restarts_in_row = 0
+        delay = min(RESTART_BACKOFF_MAX, RESTART_BACKOFF_BASE * 2 ** worker.restarts_in_row)
+        worker.restarts_in_row += 1
+        worker.restarts += 1
+        worker.restart_at = now + delay
+        worker.state = "restarting"
+        print(f"[SUPERVISOR] {worker.name}: Neustart in {delay:.0f}s", flush=True)
+
+    def _sample_cpu(self, now):
+        with self._lock:
+            everything = list(self.workers.values()) + list(self.tasks.values()) + list(self.watched.values())
+        elapsed = now - self._last_sample if self._last_sample else None
+        self._last_sample = now
+        for worker in everything:
+            thread = worker.thread
+            if thread is None or not thread.is_alive():
+                worker.cpu_percent = 0.0
+                continue
+            cpu = _proc_cpu_time(thread.native_id)
+            if cpu is None:
+                cpu = worker.cpu_reported or 0.0
+            if elapsed:
+                worker.cpu_percent = max(0.0, (cpu - worker.cpu_seconds) / elapsed * 100)
+            worker.cpu_seconds = cpu
+
+    # ----- Admin -----
+
+    def restart(self, name):
+        """Manueller Neustart beim nächsten Monitor-Durchlauf (alter Thread endet beim nächsten sleep())"""
+        worker = self.workers.get(name)
+        if worker is None or not self.running:
+            return False
+        worker.restarts += 1
+        worker.restart_at = time.time()
+        return True
+
+    def status(self):
+        now = time.time()
+        with self._lock:
+            return {
+                "running": self.running,
+                "threads": threading.active_count(),
+                "workers": [w.status(now) for w in self.workers.values()],
+                "watched": [w.status(now) for w in self.watched.values()],
+                "tasks": [t.status(now) for t in self.tasks.values()],
+                "recent_tasks": [
+                    dict(t.status(now), duration=round(t.finished - t.started, 2))
+                    for t in reversed(self.recent_tasks)
+                ],
+            }
+
+    # ----- Beenden -----
+
+    def shutdown(self, timeout=10.0):
+        """Weckt alle Worker und wartet höchstens timeout Sekunden.
+
+        Gibt die Namen der Threads zurück, die nicht rechtzeitig endeten.
+        """
+        self.running = False
+        self._stop.set()
+        with self._lock:
+            everything = list(self.workers.values()) + list(self.tasks.values())
+        return self._join(everything, timeout)
+
+    def join_watched(self, timeout=2.0):
+        """Wartet auf die fremd verwalteten Threads (nach deren stop())"""
+        with self._lock:
+            watched = list(self.watched.values())
+        return self._join(watched, timeout)
+
+    def _join(self, workers, timeout):
+        deadline = time.monotonic() + timeout
+        left = []
+        for worker in workers:
+            thread = worker.thread
+            if thread is None or thread is threading.current_thread():
+                continue
+            thread.join(max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                left.append(worker.name)
+            elif worker.state not in ("crashed", "finished"):
+                worker.state = "stopped"
+        if left:
+            print(f"[SUPERVISOR] Nicht rechtzeitig beendet: {', '.join(left)}", flush=True)
+        return left
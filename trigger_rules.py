@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Deklarative Trigger-Regeln mit inkrementeller Auswertung.
+
+Regeln stehen in trigger_rules.json und werden bei Änderung automatisch neu
+geladen (ohne Neustart). Jede Regel hält nur ein kleines Zustandsobjekt
+(deque mit Zeitstempeln, Cooldown-Zeitpunkte) - ein Eingangsereignis kostet
+amortisiert O(1).
+
+Felder einer Regel:
+    name        Eindeutiger Name
+    input       Eingang: "motion", "distance", "button", ...
+    below/above Nur Werte unter/über der Schwelle zählen (z.B. Distanz in cm)
+    hours       [start, ende) in lokaler Stunde, z.B. [22, 6] über Mitternacht
+    debounce    Sekunden, in denen nach einem gezählten Ereignis nichts zählt
+    count       Anzahl Ereignisse im Fenster bis zur Auslösung (Standard 1)
+    window      Länge des gleitenden Fensters in Sekunden
+    cooldown    Sekunden nach einer Auslösung, in denen nichts zählt
+    reset       Fenster nach Auslösung leeren (Standard true)
+    action      Beliebiges Objekt, z.B. {"record": "motion", "duration": 5}
+
+Aufzeichnungen (Trace: CSV mit zeit,eingang,wert) lassen sich gegen einen
+Regelsatz abspielen:
+    python3 trigger_rules.py replay trace.csv [--rules trigger_rules.json]
+"""
+import csv
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+RULES_PATH = BASE_DIR / "trigger_rules.json"
+RELOAD_CHECK_INTERVAL = 2.0   # Sekunden zwischen zwei mtime-Prüfungen
+
+
+class CompiledRule:
+    """Eine Regel mit ihrem inkrementellen Fenster-Zustand"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.name = spec["name"]
+        self.input = spec["input"]
+        self.below = spec.get("below")
+        self.above = spec.get("above")
+        self.hours = spec.get("hours")
+        self.debounce = float(spec.get("debounce", 0))
+        self.count = int(spec.get("count", 1))
+        self.window = float(spec.get("window", 0))
+        self.cooldown = float(spec.get("cooldown", 0))
+        self.reset = bool(spec.get("reset", True))
+        self.action = spec.get("action", {})
+
+        if self.count < 1:
+            raise ValueError(f"Regel {self.name}: count muss >= 1 sein")
+        if self.count > 1 and self.window <= 0:
+            raise ValueError(f"Regel {self.name}: count > 1 braucht ein window")
+
+        self.times = deque(maxlen=self.count)  # Mehr als count Zeitstempel braucht man nie
+        self.blocked_until = 0.0
+        self.fired = 0
+
+    def _matches(self, value, now):
+        if self.below is not None and (value is None or value >= self.below):
+            return False
+        if self.above is not None and (value is None or value <= self.above):
+            return False
+        if self.hours:
+            start, end = self.hours
+            hour = datetime.fromtimestamp(now).hour
+            inside = start <= hour < end if start <= end else (hour >= start or hour < end)
+            if not inside:
+                return False
+        return True
+
+    def feed(self, value, now):
+        """Verarbeitet ein Ereignis. Gibt True zurück, wenn die Regel auslöst."""
+        if now < self.blocked_until or not self._matches(value, now):
+            return False
+
+        self.times.append(now)
+        self.blocked_until = now + self.debounce
+        # Fenster: ältester der letzten count Zeitstempel muss im Fenster liegen
+        if len(self.times) < self.count or (self.count > 1 and now - self.times[0] > self.window):
+            return False
+
+        self.fired += 1
+        self.blocked_until = now + max(self.cooldown, self.debounce)
+        if self.reset:
+            self.times.clear()
+        return True
+
+    def window_count(self, now):
+        if self.window <= 0:
+            return len(self.times)
+        return sum(1 for t in self.times if now - t <= self.window)
+
+    def same_spec(self, spec):
+        return self.spec == spec
+
+
+def load_specs(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["rules"] if isinstance(data, dict) else data
+
+
+class RuleEngine:
+    """Wertet Eingänge gegen alle Regeln aus und lädt Änderungen automatisch nach"""
+
+    def __init__(self, path=RULES_PATH, default_rules=(), trace_path=None):
+        self.path = Path(path) if path else None
+        self.default_rules = list(default_rules)
+        self.trace_path = Path(trace_path) if trace_path else None
+        self._lock = threading.Lock()
+        self._rules = []
+        self._by_input = {}
+        self._mtime = None
+        self._next_check = 0.0
+        self._compile(self._read_specs())
+
+    def _read_specs(self):
+        if self.path and self.path.exists():
+            try:
+                self._mtime = self.path.stat().st_mtime
+                return load_specs(self.path)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[REGELN] Fehler in {self.path.name}: {e} - behalte bisherige Regeln", flush=True)
+                return None
+        self._mtime = None
+        return self.default_rules
+
+    def _compile(self, specs):
+        if specs is None:
+            return
+        try:
+            old = {rule.name: rule for rule in self._rules}
+            rules = []
+            for spec in specs:
+                # Unveränderte Regeln behalten ihren Zustand (Fenster, Cooldown)
+                previous = old.get(spec.get("name"))
+                rules.append(previous if previous and previous.same_spec(spec) else CompiledRule(spec))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"[REGELN] Ungültige Regel: {e} - behalte bisherige Regeln", flush=True)
+            return
+
+        by_input = {}
+        for rule in rules:
+            by_input.setdefault(rule.input, []).append(rule)
+        self._rules = rules
+        self._by_input = by_input
+        print(f"[REGELN] {len(rules)} Regeln aktiv: {', '.join(r.name for r in rules)}", flush=True)
+
+    def maybe_reload(self):
+        """Lädt die Regeldatei neu, wenn sie sich geändert hat (günstig, per mtime)"""
+        now = time.monotonic()
+        if not self.path or now < self._next_check:
+            return
+        self._next_check = now + RELOAD_CHECK_INTERVAL
+        try:
+            mtime = self.path.stat().st_mtime if self.path.exists() else None
+        except OSError:
+            return
+        if mtime != self._mtime:
+            with self._lock:
+                self._compile(self._read_specs())
+
+    def feed(self, input_name, value=None, now=None):
+        """Gibt die Aktionen aller ausgelösten Regeln für dieses Ereignis zurück"""
+        now = time.time() if now is None else now
+        self.maybe_reload()
+        if self.trace_path:
+            self._trace(input_name, value, now)
+        fired = []
+        with self._lock:
+            for rule in self._by_input.get(input_name, ()):
+                if rule.feed(value, now):
+                    fired.append({"rule": rule.name, **rule.action})
+        return fired
+
+    def _trace(self, input_name, value, now):
+        try:
+            with open(self.trace_path, "a", encoding="utf-8") as f:
+                f.write(f"{now:.3f},{input_name},{'' if value is None else value}\n")
+        except OSError:
+            pass
+
+    def status(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            return [{
+                "name": rule.name,
+                "input": rule.input,
+                "window_count": rule.window_count(now),
+                "count": rule.count,
+                "window": rule.window,
+                "blocked_for": round(max(0.0, rule.blocked_until - now), 1),
+                "fired": rule.fired,
+            } for rule in self._rules]
+
+
+def read_trace(path):
+    """Liest einen Trace (zeit,eingang,wert) als Liste von Tupeln"""
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            value = float(row[2]) if len(row) > 2 and row[2] != "" else None
+            events.append((float(row[0]), row[1], value))
+    return events
+
+
+def replay(specs, trace):
+    """Spielt einen Trace gegen einen Regelsatz ab. Gibt Auslösungen pro Regel zurück."""
+    engine = RuleEngine(path=None, default_rules=specs)
+    counts = {spec["name"]: 0 for spec in specs}
+    for now, input_name, value in trace:
+        for action in engine.feed(input_name, value, now=now):
+            counts[action["rule"]] += 1
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Trigger-Regeln")
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay_parser = sub.add_parser("replay", help="Trace gegen Regelsatz abspielen")
+    replay_parser.add_argument("trace")
+    replay_parser.add_argument("--rules", default=str(RULES_PATH))
+    args = parser.parse_args()
+
+    trace = read_trace(args.trace)
+    start = time.perf_counter()
+    counts = replay(load_specs(args.rules), trace)
+    elapsed = time.perf_counter() - start
+    print(f"{len(trace)} Ereignisse in {elapsed * 1000:.1f} ms abgespielt")
+    for name, fired in counts.items():
+        print(f"  {name:<24} {fired} Aufnahmen")